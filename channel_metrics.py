@@ -0,0 +1,106 @@
+"""
+Project: Vectorized Channel Metrics from S-Parameters
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that computes insertion loss (IL), return loss (RL), near- and
+      far-end crosstalk (NEXT, FEXT) and power-sum crosstalk (PSNEXT, PSFEXT) in dB for
+      every signal of a channel, directly from S-parameter arrays.
+    - Inputs are (..., freq, port, port) arrays, e.g. one touchstone file (read_touchstone),
+      a stack of variations, or SweepStore.sparams() over the whole grid. Each family is
+      one fancy-indexed gather over all variations and frequencies at once, so no AEDT
+      report has to be created or exported to get the curves.
+    - Signals are paired by their terminal names: "<signal>_T1" is the near end and
+      "<signal>_T2" the far end, with or without a case ID prefix ("C1_S11_T1").
+      The metrics use the same terms as the report expressions of channel_template.py:
+          RL     St(s_T1, s_T1)        IL     St(s_T2, s_T1)
+          NEXT   St(v_T1, a_T1)        FEXT   St(v_T2, a_T1)
+      PSNEXT/PSFEXT sum the crosstalk power from all aggressors a != v of a victim v.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+families = ("RL", "IL", "NEXT", "FEXT", "PSNEXT", "PSFEXT")
+
+# Magnitude floor of the dB values (-600 dB)
+floor = 1e-30
+
+_terminal = re.compile(r"^(?:C\d+_)?(.+)_T([12])$")
+
+
+class TerminalMap(NamedTuple):
+    """Signal names and the 0-based port indices of their near (T1) and far (T2) ends."""
+    signals: list
+    near: np.ndarray
+    far: np.ndarray
+
+
+def terminal_map(port_names):
+    """Pair the "<signal>_T1" and "<signal>_T2" ports, in order of the T1 ports."""
+    ends = {}
+    for index, name in enumerate(port_names):
+        match = _terminal.match(name)
+        if match is None:
+            raise ValueError(f"Port name {name!r} is not <signal>_T1 or <signal>_T2")
+        ends.setdefault(match.group(1), {})[match.group(2)] = index
+
+    missing = [signal for signal, end in ends.items() if set(end) != {"1", "2"}]
+    if missing:
+        raise ValueError(f"Signals without both terminals: {missing}")
+
+    signals = sorted(ends, key = lambda signal: ends[signal]["1"])
+    return TerminalMap(signals,
+                       np.array([ends[s]["1"] for s in signals]),
+                       np.array([ends[s]["2"] for s in signals]))
+
+
+def power_db(power):
+    """10*log10 of |S|^2 values."""
+    return 10 * np.log10(np.maximum(power, floor ** 2))
+
+
+def magnitude_squared(values):
+    return values.real ** 2 + values.imag ** 2
+
+
+def channel_metrics(s, port_names, metrics = families):
+    """
+    Return {metric: dB array} of a (..., freq, port, port) S-parameter array.
+
+    RL and IL have shape (..., freq, signal). NEXT and FEXT have shape
+    (..., freq, victim, aggressor), with NaN on the diagonal. PSNEXT and PSFEXT have shape
+    (..., freq, victim). Signals follow terminal_map(port_names).signals.
+    """
+    unknown = set(metrics) - set(families)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+
+    terminals = terminal_map(port_names)
+    near, far = terminals.near, terminals.far
+    result = {}
+
+    if "RL" in metrics:
+        result["RL"] = power_db(magnitude_squared(s[..., near, near]))
+    if "IL" in metrics:
+        result["IL"] = power_db(magnitude_squared(s[..., far, near]))
+
+    for family, rows in (("NEXT", near), ("FEXT", far)):
+        if family not in metrics and f"PS{family}" not in metrics:
+            continue
+        power = magnitude_squared(s[..., rows[:, None], near[None, :]])
+        diagonal = np.arange(len(near))
+        if f"PS{family}" in metrics:
+            result[f"PS{family}"] = power_db(power.sum(axis = -1) - power[..., diagonal, diagonal])
+        if family in metrics:
+            crosstalk = power_db(power)
+            crosstalk[..., diagonal, diagonal] = np.nan
+            result[family] = crosstalk
+
+    return {metric: result[metric] for metric in metrics}
@@ -0,0 +1,444 @@
+"""
+Project: Offline Design Plans for the UCIe Channel Model
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that turns a channel layout (see channel_template.py) into a plan:
+      an ordered list of operations for the objects, boundaries, ports, setup, sweep,
+      optimetrics and reports of one HFSS design.
+    - A plan is plain data. It can be saved as JSON, diffed between layouts and cached by
+      its digest.
+    - A backend executes a plan. PyAedtBackend replays it into a pyaedt.Hfss session, and
+      FakeBackend executes it in memory: it evaluates the geometry expressions, finds the
+      conductor behind each lumped port, names the terminals as HFSS does and checks
+      object names, port lists and report expressions, without AEDT or an HFSS licence.
+    - Run this file to validate the layouts of simple_ucie_channel_model.py offline.
+Dependencies:
+    - Python 3.x
+    - PyAEDT 0.18.0 (PyAedtBackend only)
+"""
+
+import re
+import ast
+import json
+import hashlib
+import operator
+from dataclasses import asdict, dataclass, field
+
+from channel_template import GSG, SSS, layout_geometry, report_expressions, report_names
+
+# Settings of simple_ucie_channel_model.py
+project_variables = {
+    "$bound_margin": "5um",
+    "$sub_margin": "5um",
+    "$sw": "2um",
+    "$ss": "2um",
+    "$mt": "2um",
+    "$dh": "2um",
+    "$model_length": "10um",
+    "$bound_marginZ": "5um",
+    "$sub_marginZ": "5um",
+    "$total_length": "2mm",
+}
+
+setup_options = {
+    "name": "Setup1",
+    "setup_type": "HFSSDriven",
+    "SolveType": "Single",
+    "Frequency": "50GHz",
+    "MaxDeltaS": 0.02,
+    "MaximumPasses": 20,
+    "MinimumPasses": 2,
+    "MinimumConvergedPasses": 2,
+    "PercentRefinement": 25,
+    "SaveAnyFields": True,
+    "SaveRadFieldsOnly": False,
+}
+
+sweep_options = {
+    "name": "Sweep",
+    "unit": "GHz",
+    "start_frequency": 0,
+    "stop_frequency": 40,
+    "step_size": 0.025,
+    "save_fields": False,
+    "save_rad_fields": False,
+    "sweep_type": "Interpolating",
+}
+
+parametric_variations = [
+    {"variable": "$sw", "start_point": "2um", "end_point": "3um", "step": "0.5um", "variation_type": "LinearStep"},
+    {"variable": "$mt", "start_point": "2um", "end_point": "3um", "step": "0.5um", "variation_type": "LinearStep"},
+]
+
+
+@dataclass
+class Operation:
+    """One step of a plan; `stage` is "model" (before analysis) or "post" (after)."""
+    kind: str
+    args: dict
+    stage: str = "model"
+
+
+@dataclass
+class Plan:
+    name: str
+    operations: list = field(default_factory = list)
+
+    def add(self, kind, stage = "model", **args):
+        self.operations.append(Operation(kind, args, stage))
+
+    def to_json(self):
+        return json.dumps({"name": self.name, "operations": [asdict(op) for op in self.operations]},
+                          indent = 1, default = list)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        return cls(data["name"], [Operation(**op) for op in data["operations"]])
+
+    def digest(self):
+        """Content hash of the plan, e.g. as a cache key."""
+        return hashlib.sha256(self.to_json().encode()).hexdigest()
+
+
+def design_plan(layout, design_name, reports = None, variables = None, setup = None, sweep = None,
+                variations = None):
+    """
+    Plan of one design of a layout, from the project variables to its reports.
+
+    `reports` maps expression families to expressions (default: the RL and IL families of
+    channel_template.report_expressions); each family becomes one report.
+    """
+    geometry = layout_geometry(layout)
+    plan = Plan(design_name)
+
+    for name, value in (variables or project_variables).items():
+        plan.add("set_variable", name = name, value = value)
+
+    plan.add("add_material", name = "HD8930", permittivity = 3.1, dielectric_loss_tangent = 0.01)
+
+    # Geometry
+    for box in [geometry.boundary, geometry.substrate, *geometry.traces]:
+        plan.add("create_box", name = box.name, origin = box.origin, sizes = box.sizes,
+                 material = box.material, **box.options)
+    for sheet in [*geometry.ports, *geometry.perfect_e]:
+        plan.add("create_rectangle", name = sheet.name, orientation = sheet.orientation,
+                 origin = sheet.origin, sizes = sheet.sizes)
+
+    # Cut the port sheets out of the PerfE sheets
+    plan.add("subtract", blank_list = ["PE_T1"], tool_list = geometry.term1_ports, keep_originals = True)
+    plan.add("subtract", blank_list = ["PE_T2"], tool_list = geometry.term2_ports, keep_originals = True)
+
+    # Assign perfect E
+    plan.add("assign_perfect_e", name = "PerfE", faces = [["PE_T1", "ymin"], ["PE_T2", "ymax"]])
+
+    # Create lumped ports
+    plan.add("subtract", blank_list = geometry.term1_ports, tool_list = geometry.sig_objs, keep_originals = True)
+    plan.add("subtract", blank_list = geometry.term2_ports, tool_list = geometry.sig_objs, keep_originals = True)
+
+    for terminal_ports, reference in ((geometry.term1_ports, "PE_T1"), (geometry.term2_ports, "PE_T2")):
+        for pname in terminal_ports:
+            plan.add("lumped_port", assignment = pname, reference = reference,
+                     deembed = "-($total_length - $model_length)/2", terminals_rename = False)
+
+    # Assign radiation boundary
+    plan.add("assign_radiation", name = "Rad1",
+             faces = [["boundary", "zmax"], ["boundary", "zmin"], ["boundary", "xmax"], ["boundary", "xmin"]])
+
+    # Solution setup, frequency sweep and optimetrics
+    setup = dict(setup or setup_options)
+    sweep = dict(sweep or sweep_options)
+    plan.add("create_setup", **setup)
+    plan.add("create_linear_step_sweep", setup = setup["name"], **sweep)
+    plan.add("add_parametric", name = "ParametricSetup1", variations = list(variations or parametric_variations))
+
+    # Reports
+    setup_sweep = f"{setup['name']} : {sweep['name']}"
+    if reports is None:
+        reports = report_expressions(layout)
+    for family, expressions in reports.items():
+        if expressions:
+            plan.add("create_report", stage = "post", name = report_names.get(family, family),
+                     expressions = list(expressions), setup = setup_sweep)
+
+    return plan
+
+
+def replay(plan, backend, stage = "model"):
+    """Execute the operations of one stage of a plan; return the backend."""
+    for op in plan.operations:
+        if op.stage == stage:
+            getattr(backend, op.kind)(**op.args)
+    return backend
+
+
+_face_axes = {"x": 0, "y": 1, "z": 2}
+
+
+class PyAedtBackend:
+    """Replays plans into a pyaedt.Hfss session; created objects are kept in `objects`."""
+
+    def __init__(self, hfss):
+        self.hfss = hfss
+        self.objects = {}
+
+    def _face(self, name, selector):
+        axis = _face_axes[selector[0]]
+        pick = max if selector[1:] == "max" else min
+        return pick(self.objects[name].faces, key = lambda f: f.center[axis]).id
+
+    def set_variable(self, name, value):
+        self.hfss[name] = value
+
+    def add_material(self, name, **properties):
+        if name.lower() in self.hfss.materials.material_keys:
+            return
+        self.hfss.materials.add_material(name)
+        for key, value in properties.items():
+            setattr(self.hfss.materials[name], key, value)
+
+    def create_box(self, name, origin, sizes, material, **options):
+        self.objects[name] = self.hfss.modeler.create_box(origin = origin, sizes = sizes, name = name,
+                                                          material = material, **options)
+        print(f"✅ Created {name}")
+
+    def create_rectangle(self, name, orientation, origin, sizes):
+        self.objects[name] = self.hfss.modeler.create_rectangle(orientation = orientation, origin = origin,
+                                                                sizes = sizes, name = name)
+        print(f"✅ Created {name}")
+
+    def subtract(self, blank_list, tool_list, keep_originals):
+        self.hfss.modeler.subtract(blank_list = blank_list, tool_list = tool_list, keep_originals = keep_originals)
+
+    def assign_perfect_e(self, name, faces):
+        self.hfss.assign_perfect_e([self._face(obj, selector) for obj, selector in faces], name = name)
+
+    def lumped_port(self, **options):
+        self.hfss.lumped_port(**options)
+
+    def assign_radiation(self, name, faces):
+        self.hfss.assign_radiation_boundary_to_faces([self._face(obj, selector) for obj, selector in faces],
+                                                     name = name)
+
+    def create_setup(self, name, setup_type, **properties):
+        self.objects[name] = self.hfss.create_setup(name = name, setup_type = setup_type, **properties)
+
+    def create_linear_step_sweep(self, setup, **options):
+        self.objects[options["name"]] = self.objects[setup].create_linear_step_sweep(**options)
+
+    def add_parametric(self, name, variations):
+        (first, *others) = [dict(v) for v in variations]
+        param_setup = self.hfss.parametrics.add(variable = first.pop("variable"), name = name, **first)
+        for variation in others:
+            param_setup.add_variation(sweep_variable = variation.pop("variable"), **variation)
+        self.objects[name] = param_setup
+
+    def create_report(self, name, expressions, setup):
+        report = self.hfss.post.reports_by_category.terminal_solution(expressions = expressions, setup = setup)
+        report.create(name)
+        self.objects[name] = report
+
+
+_units = {"nm": 1e-3, "um": 1.0, "mm": 1e3, "cm": 1e4, "m": 1e6, "": 1.0}
+_quantity = re.compile(r"^\s*([-+0-9.eE]+)\s*([a-zA-Z]*)\s*$")
+_variable = re.compile(r"\$\w+")
+_term = re.compile(r"St\(\s*([^,()\s]+)\s*,\s*([^,()\s]+)\s*\)")
+_operators = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def arithmetic(expression):
+    """
+    Value of an expression of numbers, + - * /, unary minus and parentheses.
+
+    Plans are loaded from JSON, so their expressions are parsed, never passed to eval;
+    anything else (names, calls, attributes, **, ...) raises ValueError.
+    """
+    def evaluate(node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return float(node.value)
+        if isinstance(node, ast.BinOp) and type(node.op) in _operators:
+            return _operators[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -evaluate(node.operand)
+        raise ValueError(f"{type(node).__name__} is not allowed in {expression!r}")
+
+    try:
+        tree = ast.parse(expression, mode = "eval")
+    except SyntaxError as error:
+        raise ValueError(f"cannot parse {expression!r}") from error
+    return evaluate(tree.body)
+
+
+class FakeBackend:
+    """
+    Executes plans in memory and collects problems in `errors`.
+
+    Geometry expressions are evaluated in um with the plan's variables. A lumped port is
+    attached to the signal box that its sheet touches, and its terminal is named
+    "<conductor>_T<n>" (n-th port on that conductor), as HFSS does with
+    terminals_rename = False.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.materials = {"copper", "vacuum"}
+        self.objects = {}    # name -> {"kind", "bounds", "material", "solve_inside"}
+        self.boundaries = {}
+        self.terminals = []
+        self.setups = {}
+        self.parametrics = {}
+        self.reports = {}
+        self.errors = []
+
+    # Expression evaluation
+    def value(self, expression):
+        if isinstance(expression, (int, float)):
+            return float(expression)
+        match = _quantity.match(expression)
+        if match and match.group(2) in _units:
+            return float(match.group(1)) * _units[match.group(2)]
+
+        def variable(m):
+            if m.group(0) not in self.variables:
+                raise KeyError(m.group(0))
+            return f"({self.value(self.variables[m.group(0)])})"
+
+        return arithmetic(_variable.sub(variable, expression))
+
+    def _evaluate(self, name, expressions):
+        try:
+            return [self.value(e) for e in expressions]
+        except KeyError as error:
+            self.errors.append(f"{name}: undefined variable {error.args[0]}")
+        except Exception as error:
+            self.errors.append(f"{name}: cannot evaluate {expressions}: {error}")
+        return None
+
+    def _new_object(self, name, kind, bounds, **properties):
+        if name in self.objects:
+            self.errors.append(f"Duplicate object name {name}")
+        self.objects[name] = {"kind": kind, "bounds": bounds, **properties}
+
+    def _require(self, context, names):
+        for name in names:
+            if name not in self.objects:
+                self.errors.append(f"{context}: unknown object {name}")
+
+    # Plan operations
+    def set_variable(self, name, value):
+        self.variables[name] = value
+
+    def add_material(self, name, **properties):
+        self.materials.add(name.lower())
+
+    def create_box(self, name, origin, sizes, material, **options):
+        if material.lower() not in self.materials:
+            self.errors.append(f"{name}: unknown material {material}")
+        origin = self._evaluate(name, origin)
+        sizes = self._evaluate(name, sizes)
+        bounds = None
+        if origin and sizes:
+            bounds = [(o, o + s) for o, s in zip(origin, sizes)]
+        self._new_object(name, "box", bounds, solve_inside = options.get("solve_inside", False))
+
+    def create_rectangle(self, name, orientation, origin, sizes):
+        origin = self._evaluate(name, origin)
+        sizes = self._evaluate(name, sizes)
+        bounds = None
+        if origin and sizes:
+            # The two sizes follow the axes after the normal: Y -> (Z, X)
+            normal = _face_axes[orientation.lower()]
+            extents = [0.0, 0.0, 0.0]
+            extents[(normal + 1) % 3], extents[(normal + 2) % 3] = sizes
+            bounds = [(o, o + s) for o, s in zip(origin, extents)]
+        self._new_object(name, "sheet", bounds)
+
+    def subtract(self, blank_list, tool_list, keep_originals):
+        self._require("subtract", [*blank_list, *tool_list])
+        if not keep_originals:
+            for name in tool_list:
+                self.objects.pop(name, None)
+
+    def assign_perfect_e(self, name, faces):
+        self._require(name, [obj for obj, _ in faces])
+        self.boundaries[name] = faces
+
+    def lumped_port(self, assignment, reference, deembed, terminals_rename):
+        self._require(f"Lumped port on {assignment}", [assignment, reference])
+        sheet = self.objects.get(assignment)
+        if sheet is None or sheet["bounds"] is None:
+            return
+        if sheet["kind"] != "sheet":
+            self.errors.append(f"Lumped port on {assignment}: not a sheet")
+            return
+
+        conductors = [name for name, obj in self.objects.items()
+                      if obj["kind"] == "box" and obj.get("solve_inside") and obj["bounds"]
+                      and _touches(obj["bounds"], sheet["bounds"])]
+        if len(conductors) != 1:
+            self.errors.append(f"Lumped port on {assignment}: touches {len(conductors)} signal conductors "
+                               f"({', '.join(conductors) or 'none'})")
+            return
+
+        conductor = conductors[0]
+        number = sum(t.startswith(conductor + "_T") for t in self.terminals) + 1
+        self.terminals.append(f"{conductor}_T{number}")
+
+    def assign_radiation(self, name, faces):
+        self._require(name, [obj for obj, _ in faces])
+        self.boundaries[name] = faces
+
+    def create_setup(self, name, setup_type, **properties):
+        self.setups[name] = []
+
+    def create_linear_step_sweep(self, setup, **options):
+        if setup not in self.setups:
+            self.errors.append(f"Sweep {options['name']}: unknown setup {setup}")
+            return
+        self.setups[setup].append(options["name"])
+
+    def add_parametric(self, name, variations):
+        for variation in variations:
+            if variation["variable"] not in self.variables:
+                self.errors.append(f"{name}: undefined variable {variation['variable']}")
+        self.parametrics[name] = variations
+
+    def create_report(self, name, expressions, setup):
+        setup_name, _, sweep_name = (part.strip() for part in setup.partition(":"))
+        if sweep_name not in self.setups.get(setup_name, []):
+            self.errors.append(f"Report {name}: unknown setup/sweep {setup}")
+        for expression in expressions:
+            match = _term.search(expression)
+            if not match:
+                self.errors.append(f"Report {name}: cannot parse {expression}")
+                continue
+            for terminal in match.groups():
+                if terminal not in self.terminals:
+                    self.errors.append(f"Report {name}: {expression} uses unknown terminal {terminal}")
+        self.reports[name] = expressions
+
+
+def _touches(box, sheet, tol = 1e-9):
+    """True if a sheet overlaps the cross-section of a box and lies within its extent."""
+    return all(b0 - tol <= s1 and s0 <= b1 + tol for (b0, b1), (s0, s1) in zip(box, sheet))
+
+
+def validate(plan):
+    """Run all stages of a plan on a FakeBackend; return the backend (check .errors)."""
+    backend = FakeBackend()
+    replay(plan, backend, "model")
+    replay(plan, backend, "post")
+    return backend
+
+
+if __name__ == "__main__":
+    for layout in (SSS, GSG):
+        plan = design_plan(layout, layout.name, report_expressions(layout, ("RL", "IL", "NEXT", "FEXT")))
+        backend = validate(plan)
+        print(f"{layout.name}: {len(plan.operations)} operations, {len(backend.objects)} objects, "
+              f"{len(backend.terminals)} terminals, {sum(map(len, backend.reports.values()))} report traces, "
+              f"plan {plan.digest()[:12]}")
+        for error in backend.errors:
+            print(f"⚠ {error}")
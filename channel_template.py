@@ -0,0 +1,170 @@
+"""
+Project: Parametric Channel Layouts for the UCIe Channel Model
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that generates the geometry, PerfE sheets and lumped ports of a
+      channel design from one pattern string per layer, so the SSS and GSG designs of
+      simple_ucie_channel_model.py (and new ones such as GSSG or shielded variants) share
+      one code path.
+    - Each pattern lists the conductors of a layer from left to right: "S" signal,
+      "G" ground, "-" no conductor. Patterns are given from the top layer (L1) down.
+    - layout_geometry() is pure Python and cached per layout, so arrangements can be
+      generated and compared without AEDT; channel_plan.py turns them into design plans.
+    - report_expressions() derives the RL, IL, NEXT and FEXT expressions of a layout from
+      its signal terminals "<signal>_T1" / "<signal>_T2", so no expression can name a port
+      that the design does not have.
+Dependencies:
+    - Python 3.x
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+
+from layer_stack import Box, Rectangle, port_name, port_rectangle, trace_box, trace_name
+
+
+@dataclass(frozen = True)
+class ChannelLayout:
+    """
+    Conductor arrangement of a channel design.
+
+    `layers` holds one pattern per layer, top layer (L1) first. `port_layers` sets the
+    order in which the signal layers are numbered as ports (default: bottom layer first).
+    """
+    name: str
+    layers: tuple
+    port_layers: tuple = None
+
+    def __post_init__(self):
+        # Tuples keep hand-written layouts with list patterns hashable for layout_geometry
+        object.__setattr__(self, "layers", tuple(self.layers))
+        if self.port_layers is not None:
+            object.__setattr__(self, "port_layers", tuple(self.port_layers))
+
+    @property
+    def num_layers(self):
+        return len(self.layers)
+
+    @property
+    def num_positions(self):
+        return max(len(pattern) for pattern in self.layers)
+
+    def pattern(self, layer):
+        """Pattern of a layer number (1 = top)."""
+        return self.layers[layer - 1]
+
+    def port_layer_order(self):
+        return self.port_layers or tuple(range(self.num_layers, 0, -1))
+
+
+# Designs of simple_ucie_channel_model.py
+SSS = ChannelLayout("SSS", ("SSSSSSSSSS", "GGGGGGGGGG", "SSSSSSSSSS", "GGGGGGGGGG"))
+GSG = ChannelLayout("GSG", ("SGSGSGSGSG", "GSGSGSGSGS", "SGSGSGSGSG", "GSGSGSGSGS"), port_layers = (4, 2, 3, 1))
+
+
+# Report title of each expression family
+report_names = {
+    "RL": "Return Loss",
+    "IL": "Insertion Loss",
+    "NEXT": "Near-End Crosstalk",
+    "FEXT": "Far-End Crosstalk",
+}
+
+
+class ChannelGeometry(NamedTuple):
+    boundary: Box
+    substrate: Box
+    traces: list
+    ports: list
+    perfect_e: list
+    sig_objs: list
+    term1_ports: list
+    term2_ports: list
+
+
+def signal_positions(layout):
+    """(layer, position) of each signal, in port order."""
+    return [(layer, position)
+            for layer in layout.port_layer_order()
+            for position, kind in enumerate(layout.pattern(layer), start = 1) if kind == "S"]
+
+
+@lru_cache(maxsize = None)
+def layout_geometry(layout):
+    """Objects and port lists of a layout; ports follow layout.port_layer_order()."""
+    n = layout.num_positions
+    nl = layout.num_layers
+    width = f"{n}*$sw + {n - 1}*$ss"
+    height = f"{nl}*$mt + {nl - 1}*$dh"
+
+    boundary = Box("boundary", [0, 0, 0],
+                   [f"2*$bound_margin + 2*$sub_margin + {width}", "$model_length",
+                    f"2*$bound_marginZ + 2*$sub_marginZ + {height}"],
+                   material = "vacuum", options = {"transparency": 0.9, "color": (128, 255, 255)})
+    substrate = Box("dielectric", ["$bound_margin", 0, "$bound_marginZ"],
+                    [f"2*$sub_margin + {width}", "$model_length", f"2*$sub_marginZ + {height}"],
+                    material = "HD8930", options = {"transparency": 0.9, "color": (0, 128, 128)})
+
+    # Bottom layer first, as the objects were created in the original script
+    traces = [trace_box(kind, layer, position, nl)
+              for layer in range(nl, 0, -1)
+              for position, kind in enumerate(layout.pattern(layer), start = 1) if kind in "SG"]
+
+    signals = signal_positions(layout)
+    ports = [port_rectangle(layer, position, terminal, nl)
+             for terminal in (1, 2) for layer, position in signals]
+
+    pe_sizes = [f"2*$sub_marginZ + {height}", f"2*$sub_margin + {width}"]
+    perfect_e = [Rectangle("PE_T1", ["$bound_margin", 0, "$bound_marginZ"], pe_sizes),
+                 Rectangle("PE_T2", ["$bound_margin", "$model_length", "$bound_marginZ"], pe_sizes)]
+
+    term1_ports = [port_name(layer, position) for layer, position in signals]
+    return ChannelGeometry(
+        boundary = boundary,
+        substrate = substrate,
+        traces = traces,
+        ports = ports,
+        perfect_e = perfect_e,
+        sig_objs = [trace_name("S", layer, position) for layer, position in signals],
+        term1_ports = term1_ports,
+        term2_ports = [p + "_1" for p in term1_ports],
+    )
+
+
+def crosstalk_pairs(layout, reach = 2, ordered = True):
+    """
+    (victim, aggressor) signal pairs at most `reach` positions and `reach` layers apart,
+    e.g. the two nearest signals on each side and those of the next signal layers in SSS.
+
+    With ordered = False each pair is listed once, victim first in port order, for terms
+    that are equal for both directions by reciprocity such as NEXT.
+    """
+    signals = signal_positions(layout)
+    return [(trace_name("S", *victim), trace_name("S", *aggressor))
+            for k, victim in enumerate(signals) for m, aggressor in enumerate(signals)
+            if (k != m if ordered else k < m)
+            and abs(victim[0] - aggressor[0]) <= reach and abs(victim[1] - aggressor[1]) <= reach]
+
+
+def report_expressions(layout, families = ("RL", "IL"), reach = 2):
+    """
+    {family: expressions} of a layout for the families "RL" (St(s_T1,s_T1)), "IL"
+    (St(s_T2,s_T1)), "NEXT" (St(v_T1,a_T1)) and "FEXT" (St(v_T2,a_T1)), in port order.
+
+    St(v_T1,a_T1) equals St(a_T1,v_T1), so NEXT lists each pair once; FEXT lists both
+    directions, as St(v_T2,a_T1) and St(a_T2,v_T1) are different terms.
+    """
+    signals = layout_geometry(layout).sig_objs
+    generators = {
+        "RL": lambda: [f"dB(St({s}_T1,{s}_T1))" for s in signals],
+        "IL": lambda: [f"dB(St({s}_T2,{s}_T1))" for s in signals],
+        "NEXT": lambda: [f"dB(St({v}_T1,{a}_T1))" for v, a in crosstalk_pairs(layout, reach, ordered = False)],
+        "FEXT": lambda: [f"dB(St({v}_T2,{a}_T1))" for v, a in crosstalk_pairs(layout, reach)],
+    }
+    unknown = set(families) - set(generators)
+    if unknown:
+        raise ValueError(f"Unknown report families: {sorted(unknown)}")
+    return {family: generators[family]() for family in families}
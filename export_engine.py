@@ -0,0 +1,210 @@
+"""
+Project: Pipelined Touchstone Export of Optimetrics Variations
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that exports the touchstone files of a list of optimetrics
+      variations while the post-export work (hashing, caching, renaming, ...) of the
+      previous variations runs in a bounded pool of worker threads.
+    - AEDT calls are only made from the calling thread, one variation after another.
+      While AEDT writes variation N, the workers process variations N-1, N-2, ...; at most
+      `max_pending` variations wait for post-processing, so memory stays bounded.
+    - Any object with an export_touchstone(...) method like pyaedt.Hfss can be passed,
+      e.g. stand_in_hfss.StandInHfss, which sleeps to simulate export latency (run
+      stand_in_hfss.py to check the pipelining without AEDT).
+    - With an ExportIndex, each export is keyed by a hash of (project, design, setup,
+      sweep, variation values, solution identity of the variation). The identity is a hash
+      of the solution profile AEDT keeps for that variation, so solving other variations
+      does not change it. Variations whose file, or an output derived from it (reduced or
+      renamed file), is unchanged since it was recorded under the same key are skipped, so
+      a re-run only exports new or re-solved variations.
+Dependencies:
+    - Python 3.x
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from file_stamp import file_stamp, is_unchanged
+
+
+@dataclass
+class ExportResult:
+    """Outcome of one exported variation."""
+    variation: dict
+    output_file: Any
+    export_seconds: float
+    post_seconds: float = 0.0
+    post_result: Any = None
+    skipped: bool = False
+
+
+def variation_string(variation):
+    """AEDT variation string of a {variable: value} dict, e.g. "SW='1.5um' MT='2um'"."""
+    return " ".join(f"{name}='{value}'" for name, value in variation.items())
+
+
+def solution_identity(hfss, setup, variation, work_dir):
+    """
+    Hash of the solution profile of one variation, or None if it has no solution.
+
+    The profile holds the solve log (passes, times, ...) of that variation only, so it
+    changes when the variation is re-solved but not when other variations are solved.
+    """
+    profile_path = os.path.join(str(work_dir), f"profile_{threading.get_ident()}.prof")
+    try:
+        hfss.export_profile(setup, variation_string(variation), profile_path)
+        with open(profile_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except Exception:
+        return None  # Not solved, or AEDT wrote no profile
+    finally:
+        if os.path.exists(profile_path):
+            os.remove(profile_path)
+
+
+def export_key(variation, **context):
+    """Content address of an export: a hash of the variation and its solution context."""
+    payload = json.dumps({"context": context, "variation": variation}, sort_keys = True, default = str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ExportIndex:
+    """
+    Record of exported files by key, kept as JSON (e.g. "export_index.json").
+
+    A file is current while its recorded key matches the key of the requested export and
+    either the file itself or one of the outputs derived from it (a reduced file, the
+    file renamed by port_renaming.py, ...) is unchanged. A file counts as unchanged when
+    its size and mtime match the record or, if only the mtime changed, its content
+    fingerprint does. Entries may be updated from worker threads.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = str(index_path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.entries = json.load(f)["files"]
+
+    def is_current(self, output_file, key):
+        entry = self.entries.get(str(output_file))
+        if entry is None or entry["key"] != key:
+            return False
+        return is_unchanged(output_file, entry) or any(is_unchanged(path, stamp)
+                                                      for path, stamp in entry.get("outputs", {}).items())
+
+    def record(self, output_file, key):
+        with self._lock:
+            self.entries[str(output_file)] = {"key": key, **file_stamp(output_file), "outputs": {}}
+
+    def add_output(self, output_file, path, stamp = None):
+        """
+        Record a file derived from an exported file as evidence that it is up to date.
+
+        `stamp` ({"size", "mtime_ns", "hash"}) describes the output when it was made and
+        is read from the file if None. Outputs older than the export are ignored.
+        """
+        stamp = file_stamp(path) if stamp is None else stamp
+        with self._lock:
+            entry = self.entries.get(str(output_file))
+            if entry is not None and stamp["mtime_ns"] >= entry["mtime_ns"]:
+                entry.setdefault("outputs", {})[str(path)] = stamp
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": 1, "files": self.entries}, f, indent = 1)
+            os.replace(tmp_path, self.index_path)
+
+
+def export_variations(hfss, variations, output_file, post_export = None, workers = 2, max_pending = 2,
+                      setup = "Setup1", sweep = "Sweep", index = None, context = None, solution_id = None,
+                      **export_options):
+    """
+    Export the touchstone file of each variation and pipeline the post-export work.
+
+    `variations` is an iterable of {variable: value} dicts, `output_file(variation)`
+    returns the path of its touchstone file, and `post_export(result)` is run with the
+    ExportResult of the variation in a worker thread once the file is written. Remaining keyword arguments are passed
+    to hfss.export_touchstone (e.g. renormalization, impedance).
+
+    With an ExportIndex `index`, variations whose file is current for the key built from
+    `context` (e.g. project, design), setup, sweep, variation and `solution_id(variation)`
+    (e.g. solution_identity) are not exported again. post_export still runs for them, with
+    result.skipped set, and should skip work that is already done. A variation whose
+    solution_id is None is always exported.
+
+    Returns the ExportResult of each variation in order. A failed post-export call stops
+    further exports, and its exception is re-raised once the running work has finished.
+    """
+    results = []
+    pending = threading.BoundedSemaphore(max_pending)
+    start = time.perf_counter()
+
+    def run_post(result):
+        try:
+            tic = time.perf_counter()
+            result.post_result = post_export(result)
+            result.post_seconds = time.perf_counter() - tic
+        finally:
+            pending.release()
+
+    with ThreadPoolExecutor(max_workers = workers) as pool:
+        futures = []
+        for variation in variations:
+            for future in futures:
+                if future.done() and future.exception() is not None:
+                    future.result()
+
+            path = output_file(variation)
+            key = None
+            if index is not None:
+                solution = solution_id(variation) if solution_id is not None else ""
+                if solution is not None:
+                    key = export_key(variation, setup = setup, sweep = sweep, solution = solution,
+                                     **(context or {}))
+
+            if key is not None and index.is_current(path, key):
+                result = ExportResult(variation, path, 0.0, skipped = True)
+            else:
+                tic = time.perf_counter()
+                hfss.export_touchstone(
+                    setup = setup,
+                    sweep = sweep,
+                    output_file = path,
+                    variations = list(variation.keys()),
+                    variations_value = list(variation.values()),
+                    **export_options,
+                )
+                result = ExportResult(variation, path, time.perf_counter() - tic)
+                if key is not None:
+                    index.record(path, key)
+                    index.save()
+            results.append(result)
+
+            if post_export is not None:
+                pending.acquire()  # Blocks while max_pending variations are queued
+                futures.append(pool.submit(run_post, result))
+
+        for future in futures:
+            future.result()
+
+    elapsed = time.perf_counter() - start
+    export_total = sum(r.export_seconds for r in results)
+    post_total = sum(r.post_seconds for r in results)
+    skipped = sum(r.skipped for r in results)
+    print(f"✅ Exported {len(results) - skipped} variations in {elapsed:.1f} s "
+          f"(export {export_total:.1f} s, post-export {post_total:.1f} s overlapped), "
+          f"{skipped} up to date.")
+
+    return results
@@ -0,0 +1,65 @@
+"""
+Project: Content Stamps of Touchstone Files
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that stamps a file as {"size", "mtime_ns", "hash"} and checks a
+      stamp against the file. It is shared by the case manifest of port_renaming.py, the
+      cache headers of touchstone_cache.py and the export index of export_engine.py.
+    - The hash is a fingerprint of the file size and its first and last megabyte (the
+      header and the tail of a touchstone file), so it is cheap for large files.
+    - A file is unchanged while its size and mtime match the stamp or, if only the mtime
+      changed (touched or copied), while its fingerprint does.
+Dependencies:
+    - Python 3.x
+"""
+
+import os
+import hashlib
+
+# Bytes hashed from the head and from the tail of a file for its content fingerprint
+fingerprint_size = 1024 * 1024
+
+
+def fingerprint(file_path, size = fingerprint_size):
+    """Hash the file size, the first and the last `size` bytes of a file (header and tail)."""
+    digest = hashlib.blake2b(digest_size = 16)
+    file_size = os.path.getsize(file_path)
+    digest.update(str(file_size).encode())
+
+    with open(file_path, "rb") as f:
+        digest.update(f.read(size))
+        if file_size > size:
+            f.seek(max(size, file_size - size))
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def file_stamp(file_path):
+    """Size, mtime and fingerprint of a file."""
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": fingerprint(file_path)}
+
+
+def is_unchanged(file_path, stamp):
+    """
+    Check a stamp against a file by size and mtime, then by fingerprint.
+
+    A missing file is changed. When only the mtime changed but the fingerprint matches,
+    the stamp's mtime is updated in place, so the caller can save it and skip hashing
+    next time.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    if stat.st_size != stamp["size"]:
+        return False
+    if stat.st_mtime_ns == stamp["mtime_ns"]:
+        return True
+    if fingerprint(file_path) == stamp.get("hash"):
+        stamp["mtime_ns"] = stat.st_mtime_ns  # Touched or copied, but same content
+        return True
+    return False
@@ -0,0 +1,148 @@
+"""
+Project: Compact Frequency Models for Resampling Exported Sweeps
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that fits a natural cubic spline through a subset of the frequency
+      points of an exported sweep, so the S-parameters can be served on any frequency
+      grid without exporting again.
+    - Knots are chosen adaptively: starting from every `initial_step`-th point, the point
+      with the largest error is added to every knot interval where some S-parameter is off
+      by more than `tolerance` (absolute, linear), until all points are within tolerance.
+      The smooth 0-40 GHz interpolating sweeps typically need far fewer knots than the
+      1601 exported points, so the stored model is an order of magnitude smaller.
+    - A model is saved as .npz with its knot frequencies, the complex values at the knots,
+      the port names and the reference impedance; the spline itself is rebuilt on load.
+    - The spline is solved and evaluated with NumPy only (tridiagonal solve over all
+      port pairs at once), so no SciPy is needed.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from touchstone_io import TouchstoneData
+
+# Largest allowed |S| error at the exported points, and spacing of the first knots
+tolerance = 1e-3
+initial_step = 32
+
+
+def second_derivatives(x, y):
+    """
+    Second derivatives at the knots of the natural cubic spline through (x, y).
+
+    `y` has shape (knots, ...); all trailing columns are solved at once with the Thomas
+    algorithm.
+    """
+    n = len(x)
+    values = y.reshape(n, -1)
+    m = np.zeros_like(values)
+    if n < 3:
+        return m.reshape(y.shape)
+
+    h = np.diff(x)
+    slopes = np.diff(values, axis = 0) / h[:, None]
+    rhs = 6 * np.diff(slopes, axis = 0)
+    lower = h[:-1]
+    diag = 2 * (h[:-1] + h[1:])
+    upper = h[1:]
+
+    # Forward sweep
+    c = np.empty(n - 2)
+    d = np.empty_like(rhs)
+    c[0] = upper[0] / diag[0]
+    d[0] = rhs[0] / diag[0]
+    for i in range(1, n - 2):
+        denominator = diag[i] - lower[i] * c[i - 1]
+        c[i] = upper[i] / denominator
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) / denominator
+
+    # Back substitution
+    m[n - 2] = d[n - 3]
+    for i in range(n - 4, -1, -1):
+        m[i + 1] = d[i] - c[i] * m[i + 2]
+    return m.reshape(y.shape)
+
+
+def evaluate_spline(x, y, m, x_new):
+    """Values at x_new of the spline with knots x, values y and second derivatives m."""
+    x_new = np.asarray(x_new, dtype = float)
+    if x_new.size and (x_new.min() < x[0] or x_new.max() > x[-1]):
+        raise ValueError(f"Frequencies outside the model range {x[0]:g}-{x[-1]:g} Hz")
+
+    index = np.clip(np.searchsorted(x, x_new, side = "right") - 1, 0, len(x) - 2)
+    h = x[index + 1] - x[index]
+    a = (x[index + 1] - x_new) / h
+    b = 1 - a
+    shape = (-1,) + (1,) * (y.ndim - 1)
+    a, b, h = a.reshape(shape), b.reshape(shape), h.reshape(shape)
+    return (a * y[index] + b * y[index + 1]
+            + ((a ** 3 - a) * m[index] + (b ** 3 - b) * m[index + 1]) * h ** 2 / 6)
+
+
+def select_knots(frequencies, s, tolerance = tolerance, initial_step = initial_step):
+    """Indices of the frequency points used as knots (see the module docstring)."""
+    n = len(frequencies)
+    knots = np.unique(np.r_[np.arange(0, n, initial_step), n - 1])
+    flat = s.reshape(n, -1)
+
+    while True:
+        m = second_derivatives(frequencies[knots], flat[knots])
+        error = np.abs(evaluate_spline(frequencies[knots], flat[knots], m, frequencies) - flat).max(axis = 1)
+        error[knots] = 0.0
+
+        # Worst point of each knot interval that is out of tolerance
+        interval = np.searchsorted(knots, np.arange(n), side = "right") - 1
+        bad = np.flatnonzero(error > tolerance)
+        if bad.size == 0:
+            return knots
+        order = np.lexsort((-error[bad], interval[bad]))
+        worst = bad[order][np.r_[True, np.diff(interval[bad][order]) != 0]]
+        knots = np.union1d(knots, worst)
+
+
+@dataclass
+class SplineModel:
+    """Natural cubic spline of (freq, port, port) S-parameters over knot frequencies."""
+    knots: np.ndarray
+    values: np.ndarray
+    port_names: list = field(default_factory = list)
+    z0: np.ndarray = None
+    parameter: str = "S"
+
+    def __post_init__(self):
+        self.knots = np.asarray(self.knots, dtype = float)
+        self.values = np.asarray(self.values)
+        self._m = second_derivatives(self.knots, self.values)
+
+    @classmethod
+    def fit(cls, data, tolerance = tolerance, initial_step = initial_step):
+        """Fit a TouchstoneData with adaptively chosen knots."""
+        frequencies = np.asarray(data.frequencies, dtype = float)
+        s = np.asarray(data.s)
+        knots = select_knots(frequencies, s, tolerance, initial_step)
+        return cls(frequencies[knots], s[knots], list(data.port_names), data.z0, data.parameter)
+
+    def resample(self, frequencies):
+        """S-parameters at the given frequencies (Hz), shape (freq, port, port)."""
+        return evaluate_spline(self.knots, self.values, self._m, frequencies)
+
+    def to_touchstone(self, frequencies):
+        """TouchstoneData at the given frequencies, e.g. for write_touchstone."""
+        frequencies = np.asarray(frequencies, dtype = float)
+        return TouchstoneData(frequencies = frequencies, s = self.resample(frequencies),
+                              port_names = self.port_names, z0 = self.z0, parameter = self.parameter)
+
+    def save(self, file_path):
+        np.savez(file_path, knots = self.knots, values = self.values, port_names = np.array(self.port_names),
+                 z0 = np.asarray(self.z0 if self.z0 is not None else []), parameter = self.parameter)
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as f:
+            return cls(f["knots"], f["values"], f["port_names"].tolist(), f["z0"], str(f["parameter"]))
@@ -0,0 +1,83 @@
+"""
+Project: Batch Geometry Builder for the UCIe Channel Model
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that computes the names, origins and sizes of the traces and port
+      sheets of the 4-layer channel model in Python, so every object is created with its
+      final name in one modeler call (see channel_plan.py).
+    - It replaces the duplicate_along_line + rename + object_names round-trips per trace
+      row: no object is renamed and the modeler is never re-queried for names.
+    - Objects are named as before: "{S|G}{layer}{position}" for traces and
+      "port{layer}{position}" / "port{layer}{position}_1" for the terminal 1 / terminal 2
+      port sheets, with positions 1..A (hex) from left to right and layer 1 on top.
+Dependencies:
+    - Python 3.x
+"""
+
+from dataclasses import dataclass, field
+
+# Default number of conductor layers; layer 1 is the top one
+num_layers = 4
+
+trace_colors = {"G": (145, 175, 143), "S": (175, 175, 143)}
+
+
+@dataclass
+class Box:
+    name: str
+    origin: list
+    sizes: list
+    material: str = "copper"
+    options: dict = field(default_factory = dict)
+
+
+@dataclass
+class Rectangle:
+    name: str
+    origin: list
+    sizes: list
+    orientation: str = "Y"
+
+
+def position_label(position):
+    """Position 1..10 as used in object names: 1..9, A."""
+    return hex(position)[2:].upper()
+
+
+def trace_name(kind, layer, position):
+    return f"{kind}{layer}{position_label(position)}"
+
+
+def port_name(layer, position, terminal = 1):
+    name = f"port{layer}{position_label(position)}"
+    return name if terminal == 1 else f"{name}_1"
+
+
+def _offset(base, count, step):
+    return base if count == 0 else f"{base} + {count}*({step})"
+
+
+def trace_origin(layer, position, num_layers = num_layers):
+    return [_offset("$bound_margin + $sub_margin", position - 1, "$sw + $ss"),
+            0,
+            _offset("$bound_marginZ + $sub_marginZ", num_layers - layer, "$mt + $dh")]
+
+
+def trace_box(kind, layer, position, num_layers = num_layers):
+    """Copper trace of kind "S" (signal) or "G" (ground) at a layer and position."""
+    options = {"transparency": 0.0, "color": trace_colors[kind]}
+    if kind == "S":
+        options["solve_inside"] = True
+    return Box(trace_name(kind, layer, position), trace_origin(layer, position, num_layers),
+               ["$sw", "$model_length", "$mt"], options = options)
+
+
+def port_rectangle(layer, position, terminal = 1, num_layers = num_layers):
+    """Port sheet around a trace, at y = 0 (terminal 1) or y = $model_length (terminal 2)."""
+    x, _, z = trace_origin(layer, position, num_layers)
+    return Rectangle(port_name(layer, position, terminal),
+                     [f"{x} - 0.25*$sw", 0 if terminal == 1 else "$model_length", f"{z} - 0.25*$mt"],
+                     ["$mt + 0.5*$mt", "$sw + 0.5*$sw"])
+
@@ -0,0 +1,186 @@
+"""
+Project: Passivity and Causality Checks of Exported Touchstone Files
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that checks exported S-parameters before they are handed to ACVS,
+      so a bad variation is caught before a downstream simulation is spent on it.
+    - Passivity: the largest singular value of S must not exceed 1. The singular values
+      of all frequency points are computed in one batched np.linalg.svd call
+      (compute_uv = False) on the (freq, port, port) stack.
+    - Causality: each S(i,j) is windowed and transformed to an impulse response with one
+      batched inverse real FFT; the share of its energy at negative time (second half of
+      the period, less a guard band before t = 0) must stay below `causality_tolerance`.
+      The guard band is the mainlobe half-width of the window's impulse response, 1/fmax
+      (25 ps at 40 GHz), or `guard_seconds` if set, so an early arrival of a few tens of
+      ps is still caught.
+      A uniform sweep from DC such as 0-40 GHz in 25 MHz steps is used as is; other grids
+      are resampled with frequency_model.py first.
+    - Files are checked in parallel in a process pool (see check_files), and
+      touchstone_export.py can check each variation as it is exported. Run this file to
+      check all touchstone files of a folder, after check_early_arrival has checked the
+      causality gate on a synthetic through.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from frequency_model import SplineModel
+from touchstone_cache import load_touchstone
+
+# Folder containing touchstone files
+folder_path = r"path/to/touchstone/files" # Edit path
+
+# Allowed excess of the largest singular value over 1, and share of non-causal energy
+passivity_tolerance = 1e-6
+causality_tolerance = 1e-3
+
+# Time before t = 0 left out of the non-causal energy (band-limit ringing), in seconds;
+# None for the mainlobe half-width of the window, 1/fmax
+guard_seconds = None
+
+# Worker processes of check_files
+workers = 4
+
+
+@dataclass
+class CheckResult:
+    file_path: str
+    max_singular_value: float
+    worst_frequency: float
+    passivity_violations: int
+    noncausal_energy: float
+    worst_term: tuple
+
+    @property
+    def passive(self):
+        return self.max_singular_value <= 1 + passivity_tolerance
+
+    @property
+    def causal(self):
+        return self.noncausal_energy <= causality_tolerance
+
+    @property
+    def ok(self):
+        return self.passive and self.causal
+
+
+def singular_value_peaks(s):
+    """Largest singular value at each frequency of a (..., freq, port, port) array."""
+    return np.linalg.svd(s, compute_uv = False)[..., 0]
+
+
+def uniform_from_dc(frequencies, s):
+    """The sweep on a uniform grid from DC, resampled if necessary."""
+    frequencies = np.asarray(frequencies, dtype = float)
+    steps = np.diff(frequencies)
+    if frequencies[0] == 0 and np.allclose(steps, steps[0], rtol = 1e-6):
+        return frequencies, s
+
+    step = steps.min()
+    grid = np.arange(frequencies[0], frequencies[-1] + step / 2, step)
+    s = SplineModel(frequencies, s).resample(grid)
+    if grid[0] > 0:
+        # Extend to DC with the real part of the first point
+        count = int(round(grid[0] / step))
+        grid = np.r_[np.arange(count) * step, grid]
+        s = np.concatenate([np.repeat(s[:1].real.astype(s.dtype), count, axis = 0), s])
+    return grid, s
+
+
+def noncausal_energy(frequencies, s, guard = guard_seconds):
+    """
+    Share of impulse-response energy at negative time of each S(i,j), shape (port, port).
+
+    The sweep is tapered with a half Hann window to limit the ringing from cutting it off
+    at the highest frequency. Even a causal band-limited response rings within the
+    mainlobe of the window's impulse response, which reaches 1/fmax before t = 0, so the
+    `guard` seconds just before t = 0 (1/fmax if None) are not counted.
+    """
+    frequencies, s = uniform_from_dc(frequencies, s)
+    window = np.cos(0.5 * np.pi * np.arange(len(frequencies)) / len(frequencies)) ** 2
+    impulse = np.fft.irfft(s * window[:, None, None], axis = 0)
+    energy = impulse ** 2
+
+    fmax = frequencies[-1]
+    sample_seconds = 1 / (len(impulse) * (frequencies[1] - frequencies[0]))
+    guard = 1 / fmax if guard is None else guard
+    guard_samples = int(np.ceil(guard / sample_seconds - 1e-9))
+
+    half = len(impulse) // 2
+    total = energy.sum(axis = 0)
+    total[total == 0] = 1.0
+    return energy[half:len(impulse) - guard_samples].sum(axis = 0) / total
+
+
+def check_network(frequencies, s, file_path = "", guard = guard_seconds):
+    """CheckResult of one network given as (freq, port, port) S-parameters."""
+    peaks = singular_value_peaks(s)
+    worst = int(np.argmax(peaks))
+    noncausal = noncausal_energy(frequencies, s, guard)
+    i, j = np.unravel_index(int(np.argmax(noncausal)), noncausal.shape)
+    return CheckResult(
+        file_path = str(file_path),
+        max_singular_value = float(peaks[worst]),
+        worst_frequency = float(frequencies[worst]),
+        passivity_violations = int(np.count_nonzero(peaks > 1 + passivity_tolerance)),
+        noncausal_energy = float(noncausal[i, j]),
+        worst_term = (int(i) + 1, int(j) + 1),
+    )
+
+
+def check_file(file_path):
+    """CheckResult of a touchstone file (read through its binary cache)."""
+    data = load_touchstone(file_path)
+    return check_network(data.frequencies, data.s, file_path)
+
+
+def report(result):
+    status = "✅" if result.ok else "⚠"
+    print(f"{status} {result.file_path}: max singular value {result.max_singular_value:.6f} "
+          f"at {result.worst_frequency / 1e9:g} GHz ({result.passivity_violations} points above 1), "
+          f"non-causal energy {result.noncausal_energy:.2e} in S{result.worst_term}")
+
+
+def check_files(file_paths, workers = workers):
+    """Check touchstone files in parallel; print and return the CheckResult of each."""
+    file_paths = [str(path) for path in file_paths]
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            results = list(pool.map(check_file, file_paths))
+    else:
+        results = [check_file(path) for path in file_paths]
+
+    for result in results:
+        report(result)
+    failed = sum(not result.ok for result in results)
+    print(f"Checked {len(results)} files: {len(results) - failed} passed, {failed} failed.")
+    return results
+
+
+def check_early_arrival(delay = 12e-12, early = 50e-12):
+    """A through delayed by `delay` passes the causality gate; one `early` ahead of t = 0 fails."""
+    frequencies = np.arange(0, 40e9 + 1, 25e6)
+
+    def through(arrival):
+        s = np.zeros((len(frequencies), 2, 2), dtype = complex)
+        s[:, 1, 0] = s[:, 0, 1] = 0.9 * np.exp(-2j * np.pi * frequencies * arrival)
+        return check_network(frequencies, s, f"through arriving at {arrival * 1e12:g} ps")
+
+    causal, noncausal = through(delay), through(-early)
+    assert causal.causal, f"{causal.file_path} failed with {causal.noncausal_energy:.2e}"
+    assert not noncausal.causal, f"{noncausal.file_path} passed with {noncausal.noncausal_energy:.2e}"
+    print(f"✅ Causality gate: {causal.file_path} passed ({causal.noncausal_energy:.1e}), "
+          f"{noncausal.file_path} failed ({noncausal.noncausal_energy:.1e}).")
+
+
+if __name__ == "__main__":
+    check_early_arrival()
+    check_files(sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".s40p")))
@@ -0,0 +1,281 @@
+"""
+Project: Checkpointed Pipeline Runner for the Channel Model Flow
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that runs a workflow (e.g. model -> export -> rename) as stages
+      with recorded outputs, so a re-run resumes at the first incomplete stage.
+    - A Stage runs once its required stages are complete. It reports each output file
+      with emit(path) as soon as the file is finished; ScriptStage runs a Python script
+      and emits the files that appear in a watched folder while it runs.
+    - An ItemStage processes the outputs of another stage as they are emitted, so e.g.
+      finished variations are renamed while the others are still exported. It takes them
+      one by one, or with batch = True, all outputs that arrived since its last call at
+      once (e.g. one port_renaming.main call per batch).
+    - A checkpoint (pipeline_checkpoint.json) is written after every event with the
+      status and outputs (size, mtime) of each stage and the items each ItemStage has
+      processed. A stage is skipped on a re-run if it completed, its outputs are
+      unchanged (or were processed by an ItemStage, which may move them) and none of its
+      required stages ran again; processed items are skipped.
+    - Independent stages run concurrently in threads.
+Dependencies:
+    - Python 3.x
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+# Seconds a watched file must stay unchanged before it is emitted
+settle_seconds = 5.0
+poll_seconds = 1.0
+
+
+@dataclass
+class Stage:
+    """A step run as run(emit); emit(path) reports a finished output file."""
+    name: str
+    run: Callable
+    requires: tuple = ()
+
+
+@dataclass
+class ItemStage:
+    """
+    A step run as run_item(path) on each output of the `source` stage, or with
+    batch = True as run_item(paths) -> results on the outputs waiting at each call.
+    """
+    name: str
+    run_item: Callable
+    source: str
+    workers: int = 1
+    batch: bool = False
+
+    @property
+    def requires(self):
+        return (self.source,)
+
+
+class ScriptStage(Stage):
+    """
+    Runs `python script` with extra environment variables, and emits the files matching
+    `watch` (a glob pattern) that are new or changed once they have not changed for
+    `settle` seconds. Watch completion markers written by the script where it can (e.g.
+    the ".done" files of touchstone_export.py) with settle = 0, as a file that stopped
+    changing may still be in use.
+    """
+
+    def __init__(self, name, script, watch = None, requires = (), env = None, settle = settle_seconds):
+        super().__init__(name, self._run, tuple(requires))
+        self.script = script
+        self.watch = watch
+        self.env = dict(env or {})
+        self.settle = settle
+
+    def _run(self, emit):
+        before = _snapshot(self.watch)
+        process = subprocess.Popen([sys.executable, self.script], env = {**os.environ, **self.env},
+                                   cwd = os.path.dirname(os.path.abspath(self.script)))
+        seen = {}
+        while True:
+            finished = process.poll() is not None
+            now = time.time()
+            for path, stamp in _snapshot(self.watch).items():
+                if before.get(path) == stamp or seen.get(path) == stamp:
+                    continue
+                if finished or now - stamp[1] / 1e9 >= self.settle:
+                    seen[path] = stamp
+                    emit(path)
+            if finished:
+                break
+            time.sleep(poll_seconds)
+        if process.returncode != 0:
+            raise RuntimeError(f"{self.script} exited with code {process.returncode}")
+
+
+def _snapshot(pattern):
+    """{path: (size, mtime_ns)} of the files matching a glob pattern."""
+    if pattern is None:
+        return {}
+    stamps = {}
+    for path in glob.glob(pattern):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue  # Renamed while listing
+        stamps[path] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Pipeline:
+    """Stages run in dependency order with a checkpoint file; see the module docstring."""
+
+    def __init__(self, checkpoint_path, stages):
+        self.checkpoint_path = str(checkpoint_path)
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            for name in stage.requires:
+                if name not in self.stages:
+                    raise ValueError(f"{stage.name} requires unknown stage {name}")
+
+        self.state = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                self.state = json.load(f)["stages"]
+        for name in self.stages:
+            self.state.setdefault(name, {"status": "pending", "outputs": {}, "items": {}})
+
+        self._lock = threading.Lock()
+        self._done = {name: threading.Event() for name in self.stages}
+        self._ran = set()
+        self._inboxes = {stage.name: queue.Queue() for stage in stages if isinstance(stage, ItemStage)}
+        self._consumers = {name: [] for name in self.stages}
+        for stage in stages:
+            if isinstance(stage, ItemStage):
+                self._consumers[stage.source].append(self._inboxes[stage.name])
+
+    def save(self):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "stages": self.state}, f, indent = 1)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _update(self, name, **changes):
+        with self._lock:
+            self.state[name].update(changes)
+            self.save()
+
+    def is_complete(self, name):
+        """Completed before, with unchanged outputs and no re-run of a required stage."""
+        entry = self.state[name]
+        if entry["status"] != "done" or any(r in self._ran for r in self.stages[name].requires):
+            return False
+        return all(_stamp(path) == stamp or self._consumed(name, path) for path, stamp in entry["outputs"].items())
+
+    def _consumed(self, name, path):
+        """True if an ItemStage on `name` processed the output (and may have moved it)."""
+        return any(path in self.state[stage.name]["items"] for stage in self.stages.values()
+                   if isinstance(stage, ItemStage) and stage.source == name)
+
+    def _emit(self, name, path):
+        with self._lock:
+            self.state[name]["outputs"][path] = _stamp(path)
+            self.save()
+        for consumer in self._consumers[name]:
+            consumer.put(path)
+
+    def _run_stage(self, stage):
+        name = stage.name
+        try:
+            # Items are processed while the source stage is still running
+            if isinstance(stage, ItemStage):
+                self._run_items(stage, self._inboxes[name])
+                return
+
+            for required in stage.requires:
+                self._done[required].wait()
+            if any(self.state[r]["status"] != "done" for r in stage.requires):
+                self._update(name, status = "blocked")
+                print(f"⚠ Stage {name} skipped: a required stage did not complete.")
+                return
+
+            if self.is_complete(name):
+                print(f"✅ Stage {name} is up to date.")
+                for path in self.state[name]["outputs"]:
+                    for consumer in self._consumers[name]:
+                        consumer.put(path)
+                return
+
+            self._ran.add(name)
+            self._update(name, status = "running", outputs = {})
+            print(f"Stage {name} started.")
+            tic = time.perf_counter()
+            try:
+                stage.run(lambda path: self._emit(name, path))
+            except Exception as error:
+                self._update(name, status = "failed", error = str(error))
+                print(f"⚠ Stage {name} failed: {error}")
+                return
+            self._update(name, status = "done", error = None)
+            print(f"✅ Stage {name} finished in {time.perf_counter() - tic:.1f} s.")
+        finally:
+            for consumer in self._consumers[name]:
+                consumer.put(None)
+            self._done[name].set()
+
+    def _run_items(self, stage, inbox):
+        name = stage.name
+        items = self.state[name]["items"]
+        failures = []
+
+        def process(paths):
+            try:
+                results = stage.run_item(paths) if stage.batch else [stage.run_item(paths[0])]
+            except Exception as error:
+                failures.extend(paths)
+                print(f"⚠ Stage {name} failed on {', '.join(paths)}: {error}")
+                return
+            with self._lock:
+                for path, result in zip(paths, results):
+                    items[path] = {"input": _stamp(path), "result": result}
+                self.save()
+
+        def is_processed(path):
+            entry = items.get(path)
+            # Processed (and possibly moved away) before
+            return entry is not None and (entry["input"] == _stamp(path) or _stamp(path) is None)
+
+        self._update(name, status = "running")
+        with ThreadPoolExecutor(max_workers = stage.workers) as pool:
+            finished = False
+            while not finished:
+                paths = [inbox.get()]
+                if stage.batch:
+                    # Everything emitted while the last batch ran goes into this one
+                    while paths[-1] is not None:
+                        try:
+                            paths.append(inbox.get_nowait())
+                        except queue.Empty:
+                            break
+                finished = paths[-1] is None
+                paths = [path for path in dict.fromkeys(paths) if path is not None and not is_processed(path)]
+                if not paths:
+                    continue
+                self._ran.add(name)
+                if stage.batch:
+                    process(paths)
+                else:
+                    pool.submit(process, paths)
+
+        self._done[stage.source].wait()
+        status = "failed" if failures or self.state[stage.source]["status"] != "done" else "done"
+        self._update(name, status = status)
+        print(f"{'✅' if status == 'done' else '⚠'} Stage {name}: {len(items)} items processed, "
+              f"{len(failures)} failed.")
+
+    def run(self):
+        """Run every stage that is not complete; return {stage: status}."""
+        threads = [threading.Thread(target = self._run_stage, args = (stage,), name = name)
+                   for name, stage in self.stages.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {name: self.state[name]["status"] for name in self.stages}
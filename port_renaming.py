@@ -7,61 +7,446 @@ Description:
     - This is a script that renames ports in touchstone files to be compatible with ACVS.
     - Case numbers are assigned to each touchstone file based on their order in the folder.
     - The script outputs a CSV file mapping the touchstone file to its case number.
+    - Only the "! Port[n] =" header comments are rewritten. The numeric data block is
+      streamed to a temporary file in large chunks, which then atomically replaces the
+      original, so memory use stays flat regardless of file size.
+    - The header is indexed by byte offset first. When the new labels fit in the existing
+      port lines they are patched in place through a memory map, so only the header
+      pages are touched; otherwise the file falls back to the streaming rewrite, which
+      pads the port labels with spaces to leave room for later in-place relabelling.
+    - Case IDs are assigned up front in sorted order, and the files are then rewritten
+      concurrently in a process pool of `workers` processes.
+    - Assignments and finished files are appended to a journal next to the CSV file as
+      the batch runs. The CSV file is written once from the journal at the end, and an
+      interrupted batch resumes from the journal with the same case IDs.
+    - A manifest (case_manifest.json) records the size, mtime, content fingerprint (see
+      file_stamp.py) and case ID of every processed file. Re-runs skip unchanged files
+      from a stat() call, keep the case IDs of re-exported files, and never prefix a port
+      label twice.
+      Files that already carry a case ID in their name and port labels but are missing
+      from the manifest (older runs, deleted manifest) are adopted with that case ID.
+    - The metrics and spline sidecars written by touchstone_export.py are renamed along
+      with their touchstone file, and its binary cache is removed.
+    - main() can be limited to given files, e.g. to rename exported variations as they
+      finish (see run_pipeline.py); the case IDs of the whole planned batch are then
+      fixed up front in sorted order.
 Dependencies:
     - Python 3.x
 """
 
 import os
+import re
 import csv
+import json
+import mmap
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from file_stamp import file_stamp, is_unchanged as is_stamp_unchanged
 
 # Folder containing touchstone files
 folder_path = r"path/to/touchstone/files" #Edit path
 
-# Get list of touchstone files in the folder
-touchstone_files = sorted([f for f in os.listdir(folder_path) if f.endswith(".s40p")])
+# Size of the buffered chunks used to copy the numeric data block
+chunk_size = 16 * 1024 * 1024
+
+# Spaces reserved after each rewritten port label for later in-place relabelling
+label_reserve = 8
+
+# Number of worker processes (1 processes the files one at a time)
+workers = os.cpu_count() or 1 # Edit this
+
+# Sidecars of touchstone_export.py moved along with a renamed file ({stem}: name without extension)
+sidecar_names = ("{stem}_metrics.npz", "{stem}_spline.npz")
+
+# Binary cache of touchstone_cache.py, removed on renaming as it holds the old port labels
+cache_suffixes = (".npy", ".json")
+
+_renamed_file = re.compile(r"^(C\d+)_(.+)$")
+
+
+def is_header_line(line):
+    """Return True for blank, comment (!), option (#) and keyword ([...]) lines."""
+    stripped = line.strip()
+    return not stripped or stripped[:1] in (b"!", b"#", b"[")
+
+
+def prefix_label(label, case_id):
+    """Prefix a port label (bytes) with the case ID unless it already carries it."""
+    prefix = case_id.encode() + b"_"
+    return label if label.startswith(prefix) else prefix + label
+
+
+def rename_port_line(line, case_id, reserve = 0):
+    """Prefix the label of a "! Port[n] = label" comment line (bytes) with the case ID."""
+    # Example: "! Port[1] = S11_T1" -> "! Port[1] = C1_S11_T1"
+    left, right = line.split(b"=", 1)  # Split only once
+    newline = line[len(line.rstrip(b"\r\n")):]
+    return left + b"= " + prefix_label(right.strip(), case_id) + b" " * reserve + newline
+
+
+def index_port_lines(file_path):
+    """
+    Scan the header of a touchstone file and locate its port labels.
+
+    Returns (entries, header_end), where each entry is (offset, width, label): the byte
+    offset just after the "=" of a "! Port[n] =" line, the number of bytes up to the end
+    of that line, and the stripped label. header_end is the offset just past the last
+    port line. Reading stops at the first numeric data line.
+    """
+    entries = []
+    offset = 0
+    header_end = 0
+
+    with open(file_path, "rb") as f:
+        for line in f:
+            if not is_header_line(line):
+                break
+            if line.strip().startswith(b"! Port["):
+                left, right = line.split(b"=", 1)
+                width = len(line.rstrip(b"\r\n")) - len(left) - 1
+                entries.append((offset + len(left) + 1, width, right.strip()))
+                header_end = offset + len(line)
+            offset += len(line)
+
+    return entries, header_end
+
+
+def rename_ports_in_place(file_path, case_id):
+    """
+    Patch the port labels of a touchstone file in place through a memory map.
+
+    Returns False, without touching the file, if any new label does not fit in the
+    width of its existing line.
+    """
+    entries, header_end = index_port_lines(file_path)
+
+    patches = []
+    for offset, width, label in entries:
+        field = b" " + prefix_label(label, case_id)
+        if len(field) > width:
+            return False
+        patches.append((offset, field.ljust(width)))
+
+    if not patches:
+        return True
+
+    with open(file_path, "r+b") as f:
+        with mmap.mmap(f.fileno(), header_end, access = mmap.ACCESS_WRITE) as mm:
+            for offset, field in patches:
+                mm[offset:offset + len(field)] = field
+            mm.flush()
+
+    return True
+
+
+def rename_ports_streaming(file_path, case_id, chunk_size = chunk_size, reserve = label_reserve):
+    """
+    Rewrite the port comments of a touchstone file in constant memory.
+
+    The header is rewritten line by line until the first numeric data line, and the
+    rest of the file is copied in chunks of `chunk_size` bytes to a temporary file in
+    the same folder, which atomically replaces the original. Each new label is followed
+    by `reserve` spaces.
+    """
+    folder = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix = ".", suffix = ".tmp", dir = folder)
+
+    try:
+        with open(file_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for line in src:
+                if line.strip().startswith(b"! Port["):
+                    line = rename_port_line(line, case_id, reserve)
+                dst.write(line)
+                if not is_header_line(line):
+                    break
+
+            # Copy the numeric data block untouched
+            shutil.copyfileobj(src, dst, chunk_size)
+
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def rename_ports(file_path, case_id):
+    """Rename the port labels in place when they fit, else rewrite the file by streaming."""
+    if not rename_ports_in_place(file_path, case_id):
+        rename_ports_streaming(file_path, case_id)
+
+
+def assign_case_ids(touchstone_files, start = 1):
+    """Return (case_id, filename) pairs in sorted filename order, starting at C{start}."""
+    return [(f"C{case_number}", filename)
+            for case_number, filename in enumerate(sorted(touchstone_files), start = start)]
+
+
+def case_number(case_id):
+    return int(case_id[1:])
+
+
+class MappingJournal:
+    """
+    Append-only journal behind case_mapping.csv.
+
+    Each row is "planned,<case_id>,<filename>" or "done,<case_id>,<filename>" and is
+    flushed as soon as it is written. finalize() writes the CSV file once from the
+    finished rows and removes the journal.
+    """
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.planned = {}  # filename -> case_id, in assignment order
+        self.done = set()
+
+        if os.path.exists(journal_path):
+            with open(journal_path, newline = "") as f:
+                for row in csv.reader(f):
+                    if len(row) != 3:
+                        continue  # Torn row from an interrupted run
+                    state, case_id, filename = row
+                    if state == "planned":
+                        self.planned[filename] = case_id
+                    elif state == "done":
+                        self.done.add(filename)
+
+        self._file = open(journal_path, "a", newline = "")
+        self._writer = csv.writer(self._file)
+
+    def _append(self, state, case_id, filename):
+        self._writer.writerow([state, case_id, filename])
+        self._file.flush()
+
+    def plan(self, folder_path, touchstone_files, known = None):
+        """
+        Assign case IDs to the files in the folder and return the pending assignments.
+
+        Assignments already in the journal are kept, and files listed in `known`
+        ({filename: case_id} from earlier runs) get their earlier case ID back. Files
+        whose renamed output exists are marked done, and files not seen before get the
+        next case numbers.
+        """
+        known = known or {}
+        outputs = {f"{case_id}_{filename}" for filename, case_id in self.planned.items()}
+        new_files = [f for f in touchstone_files if f not in self.planned and f not in outputs]
 
-csv_rows = [] # For writing filename and case number to CSV
+        for filename in [f for f in new_files if f in known]:
+            self.planned[filename] = known[filename]
+            self._append("planned", known[filename], filename)
 
-for case_number, filename in enumerate(touchstone_files, start = 1):
-    case_id = f"C{case_number}"
+        new_files = [f for f in new_files if f not in known]
+        start = max(map(case_number, [*self.planned.values(), *known.values()]), default = 0) + 1
+        for case_id, filename in assign_case_ids(new_files, start):
+            self.planned[filename] = case_id
+            self._append("planned", case_id, filename)
+
+        pending = []
+        for filename, case_id in self.planned.items():
+            if filename in self.done:
+                continue
+            if os.path.exists(os.path.join(folder_path, filename)):
+                pending.append((case_id, filename))
+            elif os.path.exists(os.path.join(folder_path, f"{case_id}_{filename}")):
+                self.mark_done(case_id, filename)
+            else:
+                print(f"⚠ {filename} not found.")
+
+        return pending
+
+    def mark_done(self, case_id, filename):
+        self.done.add(filename)
+        self._append("done", case_id, filename)
+
+    def finalize(self, csv_path, rows = None):
+        """Write the CSV file from `rows` or the finished rows, then remove the journal."""
+        if rows is None:
+            rows = [(case_id, os.path.splitext(filename)[0])
+                    for filename, case_id in self.planned.items() if filename in self.done]
+        rows = sorted(rows, key = lambda row: case_number(row[0]))
+
+        tmp_path = csv_path + ".tmp"
+        with open(tmp_path, "w", newline = "") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Case", "Touchstone File"])
+            writer.writerows(rows)
+        os.replace(tmp_path, csv_path)
+
+        self.close()
+        os.remove(self.journal_path)
+        return rows
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def file_record(folder_path, filename, case_id, source):
+    """Manifest entry of a processed touchstone file (see file_stamp.py)."""
+    return {"source": source, "case_id": case_id, **file_stamp(os.path.join(folder_path, filename))}
+
+
+def load_manifest(manifest_path):
+    """Return the manifest as {filename: entry}, or an empty one."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)["files"]
+
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": 1, "files": manifest}, f, indent = 1)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_unchanged(folder_path, filename, entry):
+    """Check a manifest entry against the file by size and mtime, then by fingerprint."""
+    return is_stamp_unchanged(os.path.join(folder_path, filename), entry)
+
+
+def adopt_renamed_file(folder_path, filename):
+    """
+    Manifest entry of a file renamed without a manifest, or None.
+
+    The file counts as renamed if its name starts with a case ID (e.g. "C1_GSG_a.s40p")
+    and all of its port labels carry the same prefix.
+    """
+    match = _renamed_file.match(filename)
+    if match is None:
+        return None
+    case_id, source = match.groups()
+    entries, _ = index_port_lines(os.path.join(folder_path, filename))
+    prefix = case_id.encode() + b"_"
+    if not entries or not all(label.startswith(prefix) for _, _, label in entries):
+        return None
+    return file_record(folder_path, filename, case_id, source)
+
+
+def refresh_file(folder_path, case_id, filename, source):
+    """Re-apply the case ID to the port labels of an already renamed file."""
+    rename_ports(os.path.join(folder_path, filename), case_id)
+    return file_record(folder_path, filename, case_id, source)
+
+
+def move_sidecars(folder_path, filename, new_filename):
+    """Move the metrics/spline sidecars of a renamed file and remove its binary cache."""
+    stem, new_stem = os.path.splitext(filename)[0], os.path.splitext(new_filename)[0]
+    for name in sidecar_names:
+        path = os.path.join(folder_path, name.format(stem = stem))
+        if os.path.exists(path):
+            os.replace(path, os.path.join(folder_path, name.format(stem = new_stem)))
+    for suffix in cache_suffixes:
+        path = os.path.join(folder_path, filename + suffix)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def process_file(folder_path, case_id, filename):
+    """
+    Rename the ports of one touchstone file and prefix its file name with the case ID.
+
+    Returns the manifest entry of the renamed file.
+    """
     file_path = os.path.join(folder_path, filename)
-    
-    # Read the touchstone file
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-    
+
     # Rename ports in the touchstone file
-    renamed_lines = []
-    for line in lines:
-        if line.strip().startswith("! Port["):
-            # Example: "! Port[1] = S11_T1"
-            left, right = line.split("=", 1)  # Split only once
-            right = right.strip()
-            renamed_line = f"{left}= {case_id}_{right}\n"
-            renamed_lines.append(renamed_line)
-        else:
-            renamed_lines.append(line)  # Keep all other lines untouched
-    
-    # Overwrite file with updated port mappings
-    csv_path = os.path.join(folder_path, "case_mapping.csv")
-    with open(file_path, "w") as file:
-        file.writelines(renamed_lines)
+    rename_ports(file_path, case_id)
 
     # Rename the file name by adding case ID prefix
     new_filename = f"{case_id}_{filename}"
     new_file_path = os.path.join(folder_path, new_filename)
-    os.rename(file_path, new_file_path)
-    
-    # Append to CSV rows
-    touchstone_name = os.path.splitext(filename)[0]
-    csv_rows.append([case_id, touchstone_name])
+    os.replace(file_path, new_file_path)
+    move_sidecars(folder_path, filename, new_filename)
+
+    return file_record(folder_path, new_filename, case_id, filename)
+
+
+def main(folder_path, workers = workers, files = None, planned = None):
+    """
+    Rename the touchstone files of a folder, or only the given `files`.
+
+    `planned` lists the file names of a whole batch, e.g. a sweep that is still being
+    exported: their case IDs are fixed up front in sorted order (after those of other
+    files renamed before), so renaming the files as they arrive gives the same case IDs
+    as renaming them all at once.
+    """
+    # Get list of touchstone files in the folder (or only the given ones)
+    folder_files = [f for f in os.listdir(folder_path) if f.endswith(".s40p")]
+    touchstone_files = folder_files if files is None else [f for f in folder_files if f in set(files)]
 
-    # Write CSV file
     csv_path = os.path.join(folder_path, "case_mapping.csv")
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Case", "Touchstone File"])
-        writer.writerows(csv_rows)
+    manifest_path = os.path.join(folder_path, "case_manifest.json")
+    journal_path = csv_path + ".journal"
+    manifest = load_manifest(manifest_path)
+    known = {entry["source"]: entry["case_id"] for entry in manifest.values()}
+    manifest = {f: entry for f, entry in manifest.items() if f in folder_files}
+
+    # Adopt files renamed by earlier runs that left no manifest entry
+    for f in touchstone_files:
+        if f not in manifest and (entry := adopt_renamed_file(folder_path, f)) is not None:
+            manifest[f] = entry
+            known.setdefault(entry["source"], entry["case_id"])
+
+    # Fix the case IDs of the planned files; an ID held by another file is not reused
+    if planned:
+        others = [case_id for source, case_id in known.items() if source not in set(planned)]
+        start = max(map(case_number, others), default = 0) + 1
+        holders = {case_id: source for source, case_id in known.items()}
+        known = {**{filename: case_id for case_id, filename in assign_case_ids(planned, start)
+                    if holders.get(case_id, filename) == filename}, **known}
+
+    # Skip files that were already renamed and have not changed since
+    renamed = [f for f in touchstone_files if f in manifest]
+    changed = [f for f in renamed if not is_unchanged(folder_path, f, manifest[f])]
+    new_files = [f for f in touchstone_files if f not in manifest]
+
+    if not changed and not new_files and os.path.exists(csv_path) and not os.path.exists(journal_path):
+        save_manifest(manifest_path, manifest)
+        print(f"All {len(renamed)} files are up to date. Case mapping in {csv_path}.")
+        return
+
+    journal = MappingJournal(journal_path)
+
+    try:
+        assignments = journal.plan(folder_path, new_files, known)
+        jobs = ([(refresh_file, (folder_path, manifest[f]["case_id"], f, manifest[f]["source"]))
+                 for f in changed] +
+                [(process_file, (folder_path, case_id, filename)) for case_id, filename in assignments])
+
+        def record(job, entry):
+            manifest[f"{entry['case_id']}_{entry['source']}"] = entry
+            if job is process_file:
+                journal.mark_done(entry["case_id"], entry["source"])
+
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers = workers) as pool:
+                futures = {pool.submit(job, *args): job for job, args in jobs}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+        else:
+            for job, args in jobs:
+                record(job, job(*args))
+
+        # Record files finished by an interrupted run
+        for filename in journal.done:
+            output = f"{journal.planned[filename]}_{filename}"
+            if output not in manifest:
+                manifest[output] = file_record(folder_path, output, journal.planned[filename], filename)
+
+        # Write manifest and CSV file
+        save_manifest(manifest_path, manifest)
+        csv_rows = journal.finalize(csv_path, [(entry["case_id"], os.path.splitext(entry["source"])[0])
+                                               for entry in manifest.values()])
+    finally:
+        journal.close()
+
+    print(f"Processed {len(jobs)} files. Case mapping of {len(csv_rows)} files written to {csv_path}.")
 
-print(f"Processed {len(touchstone_files)} files. Case mapping written to {csv_path}.")
 
+if __name__ == "__main__":
+    main(folder_path)
@@ -0,0 +1,109 @@
+"""
+Project: Selective-Port Extraction from Touchstone Files
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that pulls a subset of ports, or single terms such as
+      "St(S11_T2,S11_T1)" or "dB(St(S11_T1,S11_T1))", out of an exported touchstone file
+      without building the full 40x40 matrices.
+    - A valid binary cache (see touchstone_cache.py) is read through its memory map, so
+      only the selected entries are read from disk. Otherwise only the selected value
+      columns of the text data are converted to complex.
+    - Reduced networks can be written back as smaller touchstone files, e.g. only the
+      ports used by the IL/RL expressions.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import re
+
+import numpy as np
+
+from touchstone_cache import load_cached
+from touchstone_io import (TouchstoneData, read_header, read_value_rows, to_complex,
+                           value_column, write_touchstone)
+
+_term = re.compile(r"St\(\s*([^,()\s]+)\s*,\s*([^,()\s]+)\s*\)")
+
+
+def parse_term(expression):
+    """Return the (row, column) port names of an St(...) term, with or without dB()."""
+    match = _term.search(expression)
+    if not match:
+        raise ValueError(f"Not an St(port, port) term: {expression}")
+    return match.group(1), match.group(2)
+
+
+def ports_in_expressions(expressions):
+    """Port names used by a list of St(...) expressions, in order of first use."""
+    ports = []
+    for expression in expressions:
+        for port in parse_term(expression):
+            if port not in ports:
+                ports.append(port)
+    return ports
+
+
+def _port_indices(port_names, ports):
+    missing = [p for p in ports if p not in port_names]
+    if missing:
+        raise KeyError(f"Ports not found: {', '.join(missing)}")
+    return [port_names.index(p) for p in ports]
+
+
+def extract_terms(file_path, expressions):
+    """
+    Return (frequencies, {expression: complex trace}) for St(...) terms of a touchstone file.
+
+    The traces are complex S-parameters; any dB() around the term is ignored.
+    """
+    pairs = [parse_term(e) for e in expressions]
+
+    cached = load_cached(file_path)
+    if cached is not None:
+        traces = {}
+        for expression, (row, col) in zip(expressions, pairs):
+            i, j = _port_indices(cached.port_names, [row, col])
+            traces[expression] = np.array(cached.s[:, i, j])
+        return cached.frequencies, traces
+
+    header = read_header(file_path)
+    values = read_value_rows(file_path, header)
+    traces = {}
+    for expression, (row, col) in zip(expressions, pairs):
+        i, j = _port_indices(header.port_names, [row, col])
+        column = value_column(header, i, j)
+        traces[expression] = to_complex(values[:, column], values[:, column + 1], header.data_format)
+    return values[:, 0] * header.frequency_scale, traces
+
+
+def extract_ports(file_path, ports):
+    """Return the network reduced to `ports` (port names or 1-based numbers), in that order."""
+    cached = load_cached(file_path)
+    if cached is not None:
+        port_names = cached.port_names
+    else:
+        header = read_header(file_path)
+        port_names = header.port_names
+
+    ports = [port_names[p - 1] if isinstance(p, int) else p for p in ports]
+    index = _port_indices(port_names, ports)
+
+    if cached is not None:
+        s = np.array(cached.s[:, index][:, :, index])
+        return TouchstoneData(cached.frequencies, s, ports, cached.z0, cached.parameter)
+
+    values = read_value_rows(file_path, header)
+    columns = np.array([[value_column(header, i, j) for j in index] for i in index])
+    s = to_complex(values[:, columns], values[:, columns + 1], header.data_format)
+    return TouchstoneData(values[:, 0] * header.frequency_scale, s, ports, header.z0, header.parameter)
+
+
+def write_reduced_touchstone(file_path, output_path, ports, data_format = "MA"):
+    """Write the network of `file_path` reduced to `ports` to `output_path`."""
+    data = extract_ports(file_path, ports)
+    write_touchstone(output_path, data, data_format = data_format,
+                     comments = [f"Reduced from {file_path} to {len(data.port_names)} ports"])
+    return data
@@ -0,0 +1,155 @@
+"""
+Project: Port Reordering and Mixed-Mode Transforms of S-Parameters
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that reorders the ports of (..., freq, port, port) S-parameter
+      stacks (e.g. T1 ports first, or grouped per layer) and converts pairs of
+      single-ended ports to differential/common-mode ports.
+    - A reordering that is a regular stride of the ports (identity, reversal, every other
+      port, ...) is returned as a view. Any other order is gathered into an output array
+      a few frequency points at a time, so no full-size temporary is created.
+    - The mixed-mode conversion is Smm = M S M^T with the orthonormal matrix M of the
+      port pairs, applied to the whole frequency stack as two broadcast matmuls into a
+      work buffer and an output array, both of which can be reused across files so a
+      batch runs in fixed memory.
+    - Mixed-mode ports are ordered as in Touchstone v2: all differential ports, then all
+      common-mode ports, then the remaining single-ended ports.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import re
+
+import numpy as np
+
+# Frequency points gathered at a time by PortPermutation
+chunk_size = 64
+
+_port = re.compile(r"^(?:C\d+_)?S(\d+?)([0-9A-F])_T([12])$")
+
+
+def port_key(name):
+    """(layer, position, terminal) of an HFSS port name such as "S3A_T2" or "C1_S3A_T2"."""
+    match = _port.match(name)
+    if match is None:
+        raise ValueError(f"Port name {name!r} is not S<layer><position>_T<terminal>")
+    layer, position, terminal = match.groups()
+    return int(layer), int(position, 16), int(terminal)
+
+
+def port_order(port_names, order):
+    """
+    Indices that reorder the ports: "t1_first" (all T1 ports, then all T2 ports, each in
+    file order), "per_layer" (by layer, then terminal, then position) or a list of names.
+    """
+    port_names = list(port_names)
+    if order == "t1_first":
+        return np.array(sorted(range(len(port_names)), key = lambda i: (port_key(port_names[i])[2], i)))
+    if order == "per_layer":
+        keys = [port_key(name) for name in port_names]
+        return np.array(sorted(range(len(port_names)), key = lambda i: (keys[i][0], keys[i][2], keys[i][1])))
+    return np.array([port_names.index(name) for name in order])
+
+
+def _as_slice(index):
+    """The slice equivalent to an index array with a constant nonzero step, else None."""
+    if len(index) == 0:
+        return None
+    step = int(index[1] - index[0]) if len(index) > 1 else 1
+    if step == 0 or np.any(np.diff(index) != step):
+        return None
+    stop = index[-1] + step
+    return slice(int(index[0]), None if stop < 0 else int(stop), step)
+
+
+class PortPermutation:
+    """Reorders ports by an index array; see port_order."""
+
+    def __init__(self, index, port_names = None):
+        self.index = np.asarray(index)
+        self.port_names = None if port_names is None else [port_names[i] for i in self.index]
+        self._slice = _as_slice(self.index)
+
+    @property
+    def is_view(self):
+        return self._slice is not None
+
+    def apply(self, s, out = None):
+        """Reordered S-parameters: a view when possible, else written into `out`."""
+        if self._slice is not None:
+            return s[..., self._slice, self._slice]
+
+        n = len(self.index)
+        if out is None:
+            out = np.empty(s.shape[:-2] + (n, n), dtype = s.dtype)
+        rows = self.index[:, None]
+        nfreq = s.shape[-3]
+        for start in range(0, nfreq, chunk_size):
+            out[..., start:start + chunk_size, :, :] = s[..., start:start + chunk_size, rows, self.index]
+        return out
+
+
+def adjacent_pairs(port_names):
+    """(positive, negative) pairs of neighbouring signals on the same layer and terminal."""
+    groups = {}
+    for name in port_names:
+        layer, position, terminal = port_key(name)
+        groups.setdefault((layer, terminal), []).append((position, name))
+    pairs = []
+    for members in groups.values():
+        members.sort()
+        pairs += [(members[k][1], members[k + 1][1]) for k in range(0, len(members) - 1, 2)]
+    return pairs
+
+
+class MixedModeTransform:
+    """
+    Differential/common-mode conversion of the given (positive, negative) port pairs.
+
+    Ports in no pair stay single-ended. `port_names` of the result are "D(p,n)",
+    "C(p,n)" and the single-ended names.
+    """
+
+    def __init__(self, port_names, pairs):
+        port_names = list(port_names)
+        positive = [port_names.index(p) for p, _ in pairs]
+        negative = [port_names.index(n) for _, n in pairs]
+        paired = set(positive) | set(negative)
+        if len(paired) != 2 * len(pairs):
+            raise ValueError("A port appears in more than one pair")
+        single = [i for i in range(len(port_names)) if i not in paired]
+
+        n, k = len(port_names), len(pairs)
+        m = np.zeros((n, n))
+        rows = np.arange(k)
+        m[rows, positive] = m[k + rows, positive] = m[k + rows, negative] = np.sqrt(0.5)
+        m[rows, negative] = -np.sqrt(0.5)
+        m[2 * k + np.arange(len(single)), single] = 1.0
+
+        self.matrix = m
+        self.port_names = ([f"D({p},{q})" for p, q in pairs] + [f"C({p},{q})" for p, q in pairs]
+                           + [port_names[i] for i in single])
+        self._work = None
+
+    def apply(self, s, out = None):
+        """M S M^T over the whole stack, written into `out` (allocated if None)."""
+        if out is None:
+            out = np.empty(s.shape, dtype = np.result_type(s.dtype, np.float64))
+        if self._work is None or self._work.shape != out.shape or self._work.dtype != out.dtype:
+            self._work = np.empty_like(out)
+        np.matmul(self.matrix, s, out = self._work)
+        np.matmul(self._work, self.matrix.T, out = out)
+        return out
+
+    def inverse(self, smm, out = None):
+        """Single-ended S-parameters of mixed-mode ones (M is orthonormal: M^T Smm M)."""
+        if out is None:
+            out = np.empty(smm.shape, dtype = np.result_type(smm.dtype, np.float64))
+        if self._work is None or self._work.shape != out.shape or self._work.dtype != out.dtype:
+            self._work = np.empty_like(out)
+        np.matmul(self.matrix.T, smm, out = self._work)
+        np.matmul(self._work, self.matrix, out = out)
+        return out
@@ -0,0 +1,85 @@
+"""
+Project: Running the UCIe Channel Model Flow as One Pipeline
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a script that runs simple_ucie_channel_model.py (model and solve),
+      touchstone_export.py (export) and port_renaming.py (rename) as checkpointed stages
+      of one pipeline (see pipeline.py), with all folders set in one place.
+    - Exported touchstone files are renamed while the remaining variations are still
+      being exported: each file once touchstone_export.py has marked it done, in batches
+      of the files finished since the last batch, with case IDs in the sorted order of
+      all planned files.
+    - The model stage saves the sweep of each design ("<design>.sweep.json"), and the
+      export stage exports those variations of `design_name`; the model stage itself only
+      exports the nominal touchstone files.
+    - A re-run skips the stages that completed and whose outputs are unchanged, so a crash
+      in the export or rename stage resumes there instead of re-solving.
+    - The model stage is not checkpointed internally: a crash inside
+      simple_ucie_channel_model.py re-runs the whole stage, including all solves.
+Dependencies:
+    - Python 3.x
+    - PyAEDT 0.18.0
+    - HFSS 2025 R1
+"""
+
+import os
+import json
+from pathlib import Path
+
+import port_renaming
+from pipeline import ItemStage, Pipeline, ScriptStage
+
+# Folders of the flow
+work_dir = Path(r"D:\02_Users\UCIe\01_channel_model") # Edit this
+csv_dir = work_dir / "csv"
+model_touchstone_dir = work_dir / "touchstone"
+export_dir = work_dir / "export"
+
+# Project and design exported by touchstone_export.py
+project_path = work_dir / "ucie_channel_2.0W_2.0S_2.0T_2.0H.aedt" # Edit this
+design_name = "GSG_2.0W_2.0S_2.0T_2.0H" # Edit this
+
+script_dir = Path(__file__).resolve().parent
+
+
+def rename(markers):
+    """Rename the files of a batch of ".done" markers in one call; return their case IDs."""
+    folder = os.path.dirname(markers[0])
+    filenames = [os.path.basename(marker)[:-len(".done")] for marker in markers]
+
+    # Case IDs follow the sorted order of all planned files, whatever order they finish in
+    planned = None
+    list_path = os.path.join(folder, "export_list.json")
+    if os.path.exists(list_path):
+        with open(list_path) as f:
+            planned = json.load(f)["files"]
+
+    port_renaming.main(folder, files = filenames, planned = planned)
+    manifest = port_renaming.load_manifest(os.path.join(folder, "case_manifest.json"))
+    case_ids = {entry["source"]: entry["case_id"] for entry in manifest.values()}
+    return [case_ids.get(filename) for filename in filenames]
+
+
+if __name__ == "__main__":
+    export_dir.mkdir(parents = True, exist_ok = True)
+
+    stages = [
+        ScriptStage("model", script_dir / "simple_ucie_channel_model.py",
+                    watch = str(model_touchstone_dir / "*.s40p"),
+                    env = {"UCIE_PROJECT_DIR": str(work_dir),
+                           "UCIE_CSV_DIR": str(csv_dir),
+                           "UCIE_TOUCHSTONE_DIR": str(model_touchstone_dir),
+                           "UCIE_EXPORT_VARIATIONS": "0"}),
+        ScriptStage("export", script_dir / "touchstone_export.py", requires = ["model"],
+                    watch = str(export_dir / "GSG_*.s40p.done"), settle = 0,
+                    env = {"UCIE_PROJECT": str(project_path),
+                           "UCIE_DESIGN": design_name,
+                           "UCIE_SWEEP": str(work_dir / f"{design_name}.sweep.json"),
+                           "UCIE_EXPORT_DIR": str(export_dir)}),
+        ItemStage("rename", rename, source = "export", batch = True),
+    ]
+
+    status = Pipeline(work_dir / "pipeline_checkpoint.json", stages).run()
+    print(f"Pipeline finished ✨ {status}")
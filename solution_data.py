@@ -0,0 +1,82 @@
+"""
+Project: Bulk Solution Data Export without Report Objects
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that fetches report expressions (e.g. dB(St(S11_T2,S11_T1))) for
+      every solved variation with a single hfss.post.get_solution_data query, instead of
+      a create_report + export_report_to_file pair per report and variation.
+    - The result is written as one tidy CSV table with one row per (variation, frequency):
+      the swept variables, the frequency, then one column per expression.
+    - No report object is left in the project.
+Dependencies:
+    - Python 3.x
+    - NumPy
+    - PyAEDT 0.18.0 (to fetch the data)
+"""
+
+import csv
+import re
+
+import numpy as np
+
+_number = re.compile(r"^\s*([-+0-9.eE]+)")
+
+
+def _numeric(value):
+    """Float of a variation value such as 2.5, "2.5" or "2.5um"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(_number.match(str(value)).group(1))
+
+
+def fetch_solution_data(hfss, expressions, variables, setup_sweep = "Setup1 : Sweep"):
+    """
+    Fetch the expressions over all values of the swept `variables` in one query.
+
+    Returns (header, table) with header [*variables, "Freq [<unit>]", *expressions] and
+    a float table of one row per variation and frequency.
+    """
+    data = hfss.post.get_solution_data(
+        expressions = list(expressions),
+        setup_sweep_name = setup_sweep,
+        variations = {"Freq": ["All"], **{variable: ["All"] for variable in variables}},
+    )
+    if not data:
+        raise RuntimeError(f"No solution data for {setup_sweep}")
+
+    blocks = []
+    for index, variation in enumerate(data.variations):
+        data.set_active_variation(index)
+        frequencies = np.asarray(data.primary_sweep_values, dtype = float)
+        values = np.column_stack([np.asarray(data.data_real(expression), dtype = float)
+                                  for expression in expressions])
+        keys = np.tile([_numeric(variation[variable]) for variable in variables], (len(frequencies), 1))
+        blocks.append(np.column_stack([keys, frequencies, values]))
+
+    unit = data.units_sweeps.get("Freq", "GHz")
+    header = [*variables, f"Freq [{unit}]", *expressions]
+    return header, np.vstack(blocks)
+
+
+def write_table(file_path, header, table):
+    """Write a (header, table) pair as CSV."""
+    with open(file_path, "w", newline = "") as f:
+        csv.writer(f).writerow(header)
+        np.savetxt(f, table, delimiter = ",", fmt = "%.10g")
+
+
+def read_table(file_path):
+    """Read a table written by write_table; return (header, table)."""
+    with open(file_path, newline = "") as f:
+        header = next(csv.reader(f))
+    return header, np.loadtxt(file_path, delimiter = ",", skiprows = 1, ndmin = 2)
+
+
+def export_solution_data(hfss, file_path, expressions, variables, setup_sweep = "Setup1 : Sweep"):
+    """Fetch the expressions of all variations and write them to one CSV file."""
+    header, table = fetch_solution_data(hfss, expressions, variables, setup_sweep)
+    write_table(file_path, header, table)
+    print(f"✅ Exported {len(expressions)} expressions x {len(table)} rows to {file_path}")
+    return header, table
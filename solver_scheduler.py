@@ -0,0 +1,296 @@
+"""
+Project: Scheduling Optimetrics Variations on Local Solver Slots
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that splits a parametric grid (see sweep_grid.py) into independent
+      solver jobs and runs them on a local pool of solver slots, instead of solving every
+      SW x MT variation in one analyze(cores = 32, tasks = 1) call.
+    - A mesh history (mesh_history.json) records the mesh size and solve time of each
+      solved variation. Unsolved variations take the mesh of their nearest solved
+      neighbour, and the cores/tasks split of each job follows from its largest mesh:
+      as many tasks as the memory of a slot allows, with at least min_cores_per_task
+      cores each.
+    - Each job is written as JSON (variations, cores, tasks, output folder) and solved
+      either in a PyAEDT session (session_solver: each variation is set and solved with
+      analyze_setup using the job's cores and tasks, one job at a time) or by an external
+      command such as stand_in_solver.py, which sleeps and writes dummy touchstone files
+      so the scheduler can be tested without AEDT. The mesh size, solve time and cores
+      per task of each variation are added to the history.
+    - Estimated and actual throughput (variations per hour) are reported at the end.
+Dependencies:
+    - Python 3.x
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from sweep_grid import variation_key
+
+# Solver resources
+solver_slots = 2 # Edit this
+cores_per_slot = 16 # Edit this
+memory_per_slot_gb = 64 # Edit this
+min_cores_per_task = 4
+
+# Solver model used until the history has data
+default_mesh_elements = 100_000
+default_core_seconds_per_element = 0.02
+bytes_per_element = 20_000
+core_scaling = 0.8  # Speed-up of n cores is n ** core_scaling
+
+_number = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")
+
+
+def variation_point(variation):
+    """Numeric values of a variation, e.g. {"SW": "2.0um"} -> (2.0,)."""
+    return tuple(float(_number.search(str(value)).group(0)) for value in variation.values())
+
+
+class MeshHistory:
+    """Mesh size, solve time and cores (per task) of solved variations, kept as JSON."""
+
+    def __init__(self, history_path):
+        self.history_path = str(history_path)
+        self.entries = {}
+        if os.path.exists(self.history_path):
+            with open(self.history_path) as f:
+                self.entries = json.load(f)["variations"]
+
+    def record(self, variation, mesh_elements, seconds, cores):
+        self.entries[variation_key(variation)] = {
+            "variation": variation,
+            "mesh_elements": mesh_elements,
+            "seconds": seconds,
+            "cores": cores,
+        }
+
+    def save(self):
+        tmp_path = self.history_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "variations": self.entries}, f, indent = 1)
+        os.replace(tmp_path, self.history_path)
+
+    def mesh_elements(self, variation):
+        """Recorded mesh of a variation, else that of the nearest recorded one."""
+        entry = self.entries.get(variation_key(variation))
+        if entry is not None:
+            return entry["mesh_elements"]
+        point = variation_point(variation)
+        candidates = [e for e in self.entries.values() if list(e["variation"]) == list(variation)]
+        if not candidates:
+            return default_mesh_elements
+        nearest = min(candidates, key = lambda e: math.dist(variation_point(e["variation"]), point))
+        return nearest["mesh_elements"]
+
+    def core_seconds_per_element(self):
+        """Median solve cost, normalised to one core."""
+        rates = [e["seconds"] * e["cores"] ** core_scaling / e["mesh_elements"]
+                 for e in self.entries.values() if e["mesh_elements"]]
+        return statistics.median(rates) if rates else default_core_seconds_per_element
+
+
+def choose_split(mesh_elements, cores, max_tasks = None):
+    """(cores, tasks) of a job: as many tasks as memory allows, each with enough cores."""
+    task_bytes = max(mesh_elements, 1) * bytes_per_element
+    tasks = min(max(cores // min_cores_per_task, 1), max(int(memory_per_slot_gb * 1e9 // task_bytes), 1))
+    if max_tasks is not None:
+        tasks = min(tasks, max_tasks)
+    return cores, max(tasks, 1)
+
+
+def makespan(durations, slots):
+    """Wall time of jobs of the given durations on `slots` slots, longest first."""
+    finish = [0.0] * slots
+    for duration in sorted(durations, reverse = True):
+        finish[finish.index(min(finish))] += duration
+    return max(finish, default = 0.0)
+
+
+def estimate_seconds(meshes, cores, tasks, rate):
+    """Solve time of variations spread over `tasks` tasks of cores/tasks cores each."""
+    return makespan([rate * mesh / (cores / tasks) ** core_scaling for mesh in meshes], tasks)
+
+
+@dataclass
+class SolverJob:
+    name: str
+    variations: list
+    cores: int
+    tasks: int
+    mesh_elements: list
+    estimated_seconds: float
+
+
+@dataclass
+class JobResult:
+    job: SolverJob
+    seconds: float
+    returncode: int
+    variations: list = field(default_factory = list)
+
+
+def plan_jobs(variations, history, slots = solver_slots, cores = cores_per_slot, max_job_size = None,
+              distribute_variations = True):
+    """
+    Split variations into jobs of similar mesh size, at least one per slot.
+
+    Variations are sorted by expected mesh, so each job gets a cores/tasks split that fits
+    all of its variations, and cut into jobs of about equal estimated solve time. Tasks
+    solve different variations of a job, so a job has at most one task per variation,
+    unless distribute_variations is False (session_solver: the tasks split the frequency
+    points of each variation).
+    """
+    variations = sorted(variations, key = history.mesh_elements)
+    if not variations:
+        return []
+    rate = history.core_seconds_per_element()
+    count = max(min(slots, len(variations)), math.ceil(len(variations) / (max_job_size or len(variations))))
+
+    max_job_size = max_job_size or len(variations)
+    weights = [history.mesh_elements(v) for v in variations]
+    groups, start = [], 0
+    while start < len(variations):
+        left = len(variations) - start
+        jobs_left = max(count - len(groups), math.ceil(left / max_job_size))
+        target = sum(weights[start:]) / jobs_left
+        end, total = start + 1, weights[start]
+        # Fill up to the target weight, leaving at least one variation per remaining job
+        while (end < len(variations) and end - start < max_job_size
+               and total + weights[end] / 2 <= target and len(variations) - end >= jobs_left):
+            total += weights[end]
+            end += 1
+        groups.append(variations[start:end])
+        start = end
+
+    jobs = []
+    for number, group in enumerate(groups, start = 1):
+        meshes = [history.mesh_elements(v) for v in group]
+        job_cores, tasks = choose_split(max(meshes), cores, max_tasks = len(group) if distribute_variations else None)
+        if distribute_variations:
+            seconds = estimate_seconds(meshes, job_cores, tasks, rate)
+        else:
+            seconds = sum(rate * mesh / (job_cores / tasks) ** core_scaling / tasks for mesh in meshes)
+        jobs.append(SolverJob(f"job{number:03d}", group, job_cores, tasks, meshes, seconds))
+    return jobs
+
+
+def stand_in_command(job_path):
+    """Command running stand_in_solver.py on a job file."""
+    return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stand_in_solver.py"),
+            str(job_path)]
+
+
+def mesh_statistics_elements(file_path):
+    """Mesh elements of the "Total" row of an AEDT mesh statistics export, or None."""
+    with open(file_path) as f:
+        for line in f:
+            if line.strip().lower().startswith("total"):
+                numbers = re.findall(r"\b\d+\b", line)
+                return int(numbers[0]) if numbers else None
+    return None
+
+
+def session_solver(hfss, setup = "Setup1", work_dir = None):
+    """
+    solve(job) for run_jobs that solves each variation of a job in a PyAEDT session.
+
+    The design variables are set to the variation and hfss.analyze_setup runs with the
+    job's cores and tasks, which split the frequency points of the sweep (plan the jobs
+    with distribute_variations = False). The mesh size is read from the mesh statistics
+    exported to `work_dir`, else the job's estimate is kept, and the solve time is
+    recorded as that of one task (wall time x tasks). AEDT runs one analysis at a time,
+    so run_jobs should be called with slots = 1. The variables are restored afterwards.
+    """
+    def solve(job):
+        names = list(job.variations[0]) if job.variations else []
+        nominal = {name: hfss[name] for name in names}
+        solved = []
+        try:
+            for variation, estimate in zip(job.variations, job.mesh_elements):
+                for name, value in variation.items():
+                    hfss[name] = value
+                tic = time.perf_counter()
+                if not hfss.analyze_setup(setup, cores = job.cores, tasks = job.tasks):
+                    raise RuntimeError(f"{setup} did not solve {variation_key(variation)}")
+                seconds = time.perf_counter() - tic
+
+                mesh = None
+                if work_dir is not None:
+                    stats_path = os.path.join(work_dir, f"{job.name}_{len(solved)}.mstat")
+                    if hfss.export_mesh_stats(setup, output_file = stats_path) and os.path.exists(stats_path):
+                        mesh = mesh_statistics_elements(stats_path)
+                solved.append({"variation": variation, "mesh_elements": mesh or estimate,
+                               "seconds": seconds * job.tasks, "cores": job.cores / job.tasks})
+        finally:
+            for name, value in nominal.items():
+                hfss[name] = value
+        return solved
+
+    return solve
+
+
+def run_jobs(jobs, command, work_dir, history = None, slots = solver_slots, solve = None):
+    """
+    Run each job with command(job_path) on `slots` parallel slots, or with solve(job).
+
+    The job file (work_dir/<job>.json) lists the variations, cores, tasks and output
+    folder; the command is expected to write work_dir/<job>.result.json with
+    {"variations": [{"variation", "mesh_elements", "seconds", "cores"}, ...]}, where
+    seconds is the solve time of the variation on its task of `cores` cores. solve(job),
+    e.g. session_solver(hfss), returns that list directly.
+    """
+    os.makedirs(work_dir, exist_ok = True)
+
+    def run(job):
+        job_path = os.path.join(work_dir, f"{job.name}.json")
+        result_path = os.path.join(work_dir, f"{job.name}.result.json")
+        with open(job_path, "w") as f:
+            json.dump({**asdict(job), "output_dir": str(work_dir), "result_file": result_path}, f, indent = 1)
+
+        tic = time.perf_counter()
+        if solve is not None:
+            try:
+                variations, returncode = solve(job), 0
+            except Exception as error:
+                print(f"⚠ {job.name} failed: {error}")
+                variations, returncode = [], 1
+            result = JobResult(job, time.perf_counter() - tic, returncode, variations)
+        else:
+            completed = subprocess.run(command(job_path))
+            result = JobResult(job, time.perf_counter() - tic, completed.returncode)
+            if completed.returncode == 0 and os.path.exists(result_path):
+                with open(result_path) as f:
+                    result.variations = json.load(f)["variations"]
+        status = "✅" if result.returncode == 0 else "⚠"
+        print(f"{status} {job.name}: {len(job.variations)} variations, {job.cores} cores / {job.tasks} tasks, "
+              f"{result.seconds:.1f} s (estimated {job.estimated_seconds:.1f} s)")
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = slots) as pool:
+        results = list(pool.map(run, jobs))
+    elapsed = time.perf_counter() - start
+
+    if history is not None:
+        for result in results:
+            for solved in result.variations:
+                history.record(solved["variation"], solved["mesh_elements"], solved["seconds"], solved["cores"])
+        history.save()
+
+    solved = sum(len(r.variations) for r in results)
+    estimated = makespan([job.estimated_seconds for job in jobs], slots)
+    planned = sum(len(job.variations) for job in jobs)
+    print(f"✅ Solved {solved}/{planned} variations in {elapsed:.1f} s: "
+          f"{3600 * solved / max(elapsed, 1e-9):.0f} variations/h "
+          f"(estimated {3600 * planned / max(estimated, 1e-9):.0f} variations/h)")
+    return results
@@ -0,0 +1,144 @@
+"""
+Project: Stand-in Hfss for Testing the Export Engine
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module with a stand-in for pyaedt.Hfss that export_engine.export_variations
+      can drive without AEDT or a licence: export_touchstone sleeps for `export_seconds`
+      to simulate export latency and writes a small dummy 40-port touchstone file.
+    - solve(variation) records a solve, and export_profile writes a profile of that solve,
+      as AEDT does for export_engine.solution_identity.
+    - Run this file to check that exports overlap the post-export work of earlier
+      variations, that a failed post-export call stops further exports, and that after
+      solving added variations an incremental export only exports those.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import os
+import time
+import tempfile
+
+from export_engine import ExportIndex, export_variations, solution_identity, variation_string
+from stand_in_solver import dummy_network
+from touchstone_io import write_touchstone
+
+# Simulated latencies (seconds) and number of variations of the checks
+export_seconds = 0.2
+post_seconds = 0.2
+num_variations = 8
+
+
+class StandInHfss:
+    """Records each export_touchstone call and writes a dummy file after a sleep."""
+
+    def __init__(self, export_seconds = export_seconds):
+        self.export_seconds = export_seconds
+        self.exported = []
+        self.solves = {}
+
+    def solve(self, variation):
+        key = variation_string(variation)
+        self.solves[key] = self.solves.get(key, 0) + 1
+
+    def export_profile(self, setup, variation, output_file):
+        if variation not in self.solves:
+            raise RuntimeError(f"No solution for {variation}")
+        with open(output_file, "w") as f:
+            f.write(f"{setup} : {variation} solve {self.solves[variation]}\n")
+        return output_file
+
+    def export_touchstone(self, setup, sweep, output_file, variations, variations_value, **options):
+        time.sleep(self.export_seconds)
+        variation = dict(zip(variations, variations_value))
+        write_touchstone(output_file, dummy_network(len(self.exported)),
+                         comments = [f"{setup} : {sweep} {variation}"])
+        self.exported.append(variation)
+        return True
+
+
+def sweep_variations(count = num_variations):
+    return [{"SW": f"{1.5 + 0.5 * k}um", "MT": "2.0um", "DT": "2.0um"} for k in range(count)]
+
+
+def output_file(work_dir):
+    return lambda variation: os.path.join(work_dir, f"GSG_{variation['SW']}W.s40p")
+
+
+def check_overlap(work_dir):
+    """Exports run while the post-export work of earlier variations runs."""
+    hfss = StandInHfss()
+    tic = time.perf_counter()
+    results = export_variations(hfss, sweep_variations(), output_file(work_dir),
+                                post_export = lambda result: time.sleep(post_seconds), workers = 2, max_pending = 2)
+    elapsed = time.perf_counter() - tic
+
+    serial = num_variations * (export_seconds + post_seconds)
+    assert len(results) == num_variations and len(hfss.exported) == num_variations
+    assert all(os.path.exists(result.output_file) for result in results)
+    assert elapsed < 0.75 * serial, f"{elapsed:.2f} s is not below 75% of the serial {serial:.2f} s"
+    print(f"✅ {num_variations} exports with post-export work in {elapsed:.2f} s (serial {serial:.2f} s).")
+
+
+def check_failure_stops_exports(work_dir, fail_at = 2):
+    """A failed post-export call stops further exports and is re-raised."""
+    hfss = StandInHfss(export_seconds / 4)
+    failing = sweep_variations()[fail_at]
+
+    def post_export(result):
+        if result.variation == failing:
+            raise RuntimeError(f"post-export failed on {result.variation['SW']}")
+
+    try:
+        export_variations(hfss, sweep_variations(), output_file(work_dir), post_export = post_export,
+                          workers = 2, max_pending = 2)
+    except RuntimeError as error:
+        assert "post-export failed" in str(error)
+    else:
+        raise AssertionError("The post-export failure was not re-raised")
+
+    assert len(hfss.exported) < num_variations, "Exports continued after the post-export failure"
+    print(f"✅ Post-export failure at variation {fail_at + 1} stopped exports after "
+          f"{len(hfss.exported)} of {num_variations}.")
+
+
+def check_incremental_slice(work_dir):
+    """After solving one added SW value, only the variations of that SW are exported."""
+    hfss = StandInHfss(0.0)
+    index = ExportIndex(os.path.join(work_dir, "export_index.json"))
+
+    def grid(sw_values):
+        return [{"SW": sw, "MT": mt, "DT": "2.0um"} for sw in sw_values for mt in ("2.0um", "3.0um")]
+
+    def grid_file(variation):
+        return os.path.join(work_dir, f"GSG_{variation['SW']}W_{variation['MT']}T.s40p")
+
+    def export(sw_values):
+        before = len(hfss.exported)
+        export_variations(hfss, grid(sw_values), grid_file, index = index, context = {"design": "GSG"},
+                          solution_id = lambda variation: solution_identity(hfss, "Setup1", variation, work_dir))
+        return hfss.exported[before:]
+
+    for variation in grid(["1.5um", "2.0um"]):
+        hfss.solve(variation)
+    assert len(export(["1.5um", "2.0um"])) == 4
+
+    for variation in grid(["2.5um"]):
+        hfss.solve(variation)
+    exported = export(["1.5um", "2.0um", "2.5um"])
+    assert [v["SW"] for v in exported] == ["2.5um", "2.5um"], f"Exported {exported}"
+
+    hfss.solve(grid(["1.5um"])[0])
+    assert export(["1.5um", "2.0um", "2.5um"]) == grid(["1.5um"])[:1]
+    print("✅ Solving an added SW value exported only its 2 variations; a re-solve exported only itself.")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        check_overlap(work_dir)
+    with tempfile.TemporaryDirectory() as work_dir:
+        check_failure_stops_exports(work_dir)
+    with tempfile.TemporaryDirectory() as work_dir:
+        check_incremental_slice(work_dir)
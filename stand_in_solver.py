@@ -0,0 +1,75 @@
+"""
+Project: Stand-in Solver for Testing the Solver Scheduler
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a script that stands in for an HFSS batch solve of one job written by
+      solver_scheduler.py, so the scheduler can be tested without AEDT or a licence.
+    - For each variation it makes up a mesh size that grows with the geometry values,
+      sleeps for a time proportional to mesh / cores, and writes a dummy 40-port
+      touchstone file with HFSS port names.
+    - The mesh size and solve time of each variation are written to the job's result file.
+    - Usage: python stand_in_solver.py <job.json>
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+from solver_scheduler import core_scaling, makespan, variation_point
+from sweep_grid import variation_key
+from touchstone_io import TouchstoneData, write_touchstone
+
+# Sleep per mesh element and core, and size of the dummy files
+seconds_per_element = 2e-6
+num_ports = 40
+num_frequencies = 11
+
+port_names = [f"S{layer}{position:X}_T{terminal}"
+              for terminal in (1, 2) for layer in (1, 3) for position in range(1, 11)]
+
+
+def mesh_elements(variation):
+    return int(50_000 * np.prod(variation_point(variation)) ** 0.5)
+
+
+def dummy_network(seed):
+    rng = np.random.default_rng(seed)
+    s = 0.1 * (rng.standard_normal((num_frequencies, num_ports, num_ports))
+               + 1j * rng.standard_normal((num_frequencies, num_ports, num_ports)))
+    return TouchstoneData(frequencies = np.linspace(0, 40e9, num_frequencies), s = s,
+                          port_names = port_names, z0 = [50.0] * num_ports, parameter = "S")
+
+
+def main(job_path):
+    with open(job_path) as f:
+        job = json.load(f)
+
+    cores_per_task = job["cores"] / job["tasks"]
+    meshes = [mesh_elements(variation) for variation in job["variations"]]
+    seconds = [seconds_per_element * mesh / cores_per_task ** core_scaling for mesh in meshes]
+
+    # Tasks solve variations side by side
+    time.sleep(makespan(seconds, job["tasks"]))
+
+    solved = []
+    for number, variation in enumerate(job["variations"]):
+        label = variation_key(variation).replace(";", "_").replace("=", "")
+        write_touchstone(os.path.join(job["output_dir"], f"{label}.s{num_ports}p"),
+                         dummy_network(number), comments = [f"Variation {variation_key(variation)}"])
+        solved.append({"variation": variation, "mesh_elements": meshes[number], "seconds": seconds[number],
+                       "cores": cores_per_task})
+
+    with open(job["result_file"], "w") as f:
+        json.dump({"variations": solved}, f, indent = 1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,141 @@
+"""
+Project: Surrogate Model of the SW/MT/DT Sweep Grid
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that answers off-grid geometry queries (e.g. SW = 2.2um,
+      MT = 3.1um) from the variations already solved on a Cartesian sweep grid, by
+      multilinear interpolation of S-parameters or derived curves such as IL/RL.
+    - Each prediction comes with an error estimate from the curvature of the data along
+      each axis: linear interpolation between grid points t and h - t away is off by
+      about t * (h - t) / 2 * |f''|, with f'' taken from second differences of the
+      solved neighbours. The estimate is zero on the grid and largest in the middle of
+      strongly curved cells, which is where another solve pays off.
+    - Only the 2^d corners of the query's cell and their neighbours are read, so a model
+      over SweepStore.sparams() works from the memory map without loading the sweep.
+      Axes with fewer than three values have no curvature estimate and add no error.
+    - Grid points the store has not written yet are zeros in its memory map, so a query
+      whose cell corners or curvature neighbours are unwritten raises ValueError instead
+      of interpolating them.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import re
+from itertools import product
+
+import numpy as np
+
+_number = re.compile(r"^\s*([-+]?[0-9.]+(?:[eE][-+]?[0-9]+)?)")
+
+
+def axis_values(labels):
+    """Numeric values of axis labels, e.g. ["1.5um", "2.0um"] -> [1.5, 2.0]."""
+    return np.array([float(_number.match(str(label)).group(1)) for label in labels])
+
+
+class GridSurrogate:
+    """
+    Multilinear interpolation with error estimates over a Cartesian grid.
+
+    `axes` maps each variable to its increasing grid values; `values` has shape
+    (len(axis)..., *output) and may be a memory map. `written` is a boolean array of the
+    grid shape marking the points that hold data (default: all); a query that needs an
+    unwritten point raises ValueError.
+    """
+
+    def __init__(self, axes, values, written = None):
+        self.axes = {name: np.asarray(points, dtype = float) for name, points in axes.items()}
+        self.values = values
+        grid = tuple(len(points) for points in self.axes.values())
+        for name, points in self.axes.items():
+            if np.any(np.diff(points) <= 0):
+                raise ValueError(f"Axis {name} is not increasing: {points}")
+        if grid != values.shape[:len(self.axes)]:
+            raise ValueError("Grid axes do not match the shape of the values")
+        self.written = np.ones(grid, dtype = bool) if written is None else np.asarray(written, dtype = bool)
+        if self.written.shape != grid:
+            raise ValueError("The written mask does not match the grid")
+
+    @classmethod
+    def from_store(cls, store, transform = None):
+        """
+        Surrogate over a SweepStore: of its S-parameters (axis..., freq, port, port), or of
+        transform(s) of each grid point, e.g.
+        lambda s: channel_metrics(s, store.port_names, ["IL"])["IL"].
+        """
+        axes = {name: axis_values(labels) for name, labels in store.axes.items()}
+        values = store.sparams()
+        grid = values.shape[:len(axes)]
+        written = np.zeros(grid, dtype = bool)
+        for index in store.written:
+            written[index] = True
+        if transform is not None:
+            # Unwritten points are never read, so they are left as zeros
+            first = transform(np.asarray(values[next(iter(store.written))])) if store.written else np.zeros(0)
+            transformed = np.zeros(grid + np.shape(first), dtype = np.result_type(first))
+            for index in store.written:
+                transformed[index] = transform(np.asarray(values[index]))
+            values = transformed
+        return cls(axes, values, written)
+
+    def _cell(self, name, value):
+        """(lower index, fraction, spacing) of a value on one axis."""
+        points = self.axes[name]
+        if not points[0] - 1e-12 <= value <= points[-1] + 1e-12:
+            raise ValueError(f"{name} = {value:g} is outside the grid {points[0]:g}-{points[-1]:g}")
+        if len(points) == 1:
+            return 0, 0.0, 0.0
+        i = int(np.clip(np.searchsorted(points, value, side = "right") - 1, 0, len(points) - 2))
+        h = points[i + 1] - points[i]
+        return i, (value - points[i]) / h, h
+
+    def _value(self, index):
+        """Data of a grid point, which must have been written."""
+        if not self.written[index]:
+            point = ", ".join(f"{name} = {points[i]:g}" for (name, points), i in zip(self.axes.items(), index))
+            raise ValueError(f"Grid point {point} has no data")
+        return self.values[index]
+
+    def _curvature(self, k, index):
+        """|f''| along axis k at a grid point, from the nearest three points."""
+        points = self.axes[list(self.axes)[k]]
+        if len(points) < 3:
+            return 0.0
+        i = min(max(index[k], 1), len(points) - 2)
+        x0, x1, x2 = points[i - 1:i + 2]
+        around = [self._value(index[:k] + (j,) + index[k + 1:]) for j in (i - 1, i, i + 1)]
+        f0, f1, f2 = (np.asarray(v) for v in around)
+        h0, h1 = x1 - x0, x2 - x1
+        return np.abs(2 * ((f2 - f1) / h1 - (f1 - f0) / h0) / (h0 + h1))
+
+    def predict(self, **point):
+        """(value, error estimate) at a point given as variable = value keywords."""
+        cells = [self._cell(name, float(point[name])) for name in self.axes]
+        value = 0.0
+        curvature = [0.0] * len(cells)
+        for corner in product((0, 1), repeat = len(cells)):
+            weight = 1.0
+            index = []
+            for (i, t, h), upper in zip(cells, corner):
+                if h == 0.0 and upper:
+                    weight = 0.0
+                weight *= t if upper else 1 - t
+                index.append(i + upper if h else i)
+            if weight == 0.0:
+                continue
+            index = tuple(index)
+            value = value + weight * np.asarray(self._value(index))
+            for k, (_, t, h) in enumerate(cells):
+                if 0.0 < t < 1.0:
+                    curvature[k] = np.maximum(curvature[k], self._curvature(k, index))
+
+        error = sum(0.5 * t * (1 - t) * h ** 2 * c for (_, t, h), c in zip(cells, curvature))
+        return value, error * np.ones(np.shape(value))
+
+    def predict_many(self, points):
+        """Values and errors of a sequence of {variable: value} points, stacked."""
+        results = [self.predict(**point) for point in points]
+        return np.stack([v for v, _ in results]), np.stack([e for _, e in results])
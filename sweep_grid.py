@@ -0,0 +1,219 @@
+"""
+Project: Exact Sweep Grids for Optimetrics Variations
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that replaces the float-accumulating current_sweep() helpers of
+      simple_ucie_channel_model.py and touchstone_export.py.
+    - Sweep values are stepped in Decimal, so 1.5 + 0.5 + 0.5 is exactly 2.5 and no 1e-12
+      tolerance is needed.
+    - Every value has one canonical label with at least one decimal place and no other
+      trailing zeros, e.g. 2 -> "2.0um", 2.50 -> "2.5um", 0.025 -> "0.025GHz". Labels,
+      file names and cache keys therefore agree between scripts.
+    - LinearStep, LinearCount and ValueList sweeps are combined into Cartesian or Zip
+      grids. A LinearCount whose step is not an exact decimal (e.g. 0 to 1 in 4 values)
+      is rejected rather than rounded, so its labels stay exact. Sweeps and grids are lazy: values are computed on access, so grids of 10k+
+      points are never materialised.
+Dependencies:
+    - Python 3.x
+"""
+
+import re
+from abc import ABC, abstractmethod
+from decimal import Decimal, Inexact, localcontext
+from itertools import product
+
+
+def to_decimal(value):
+    """Exact Decimal of a number; floats are taken by their shortest repr (0.1 -> 0.1)."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def format_value(value, unit = ""):
+    """Canonical label of a sweep value, e.g. format_value(2, "um") -> "2.0um"."""
+    text = format(to_decimal(value).normalize(), "f")
+    if "." not in text:
+        text += ".0"
+    return f"{text}{unit}"
+
+
+def parse_label(label):
+    """Value and unit of a label, e.g. parse_label("2.5um") -> (Decimal("2.5"), "um")."""
+    match = re.fullmatch(r"([-+]?\d+(?:\.\d*)?)(.*)", label.strip())
+    if match is None:
+        raise ValueError(f"Not a sweep label: {label!r}")
+    return Decimal(match.group(1)), match.group(2)
+
+
+class Sweep(ABC):
+    """Lazy sequence of the labels of one sweep variable."""
+
+    unit = ""
+
+    @abstractmethod
+    def value(self, index):
+        """Exact Decimal value at `index`, without unit."""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of values."""
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return format_value(self.value(index), self.unit)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield format_value(self.value(index), self.unit)
+
+    def values(self):
+        """Sweep values as Decimals, without unit."""
+        return (self.value(index) for index in range(len(self)))
+
+
+class LinearStep(Sweep):
+    """Values from start to stop (inclusive when reached exactly) in steps of step."""
+
+    def __init__(self, start, stop, step, unit = ""):
+        self.start = to_decimal(start)
+        self.stop = to_decimal(stop)
+        self.step = to_decimal(step)
+        self.unit = unit
+        if self.step <= 0:
+            raise ValueError(f"Step must be positive: {step}")
+
+    def value(self, index):
+        return self.start + index * self.step
+
+    def __len__(self):
+        if self.stop < self.start:
+            return 0
+        return int((self.stop - self.start) // self.step) + 1
+
+
+class LinearCount(Sweep):
+    """
+    `count` evenly spaced values from start to stop, both included. The step must be an
+    exact decimal, e.g. LinearCount(0, 1, 5) steps by 0.25, but LinearCount(0, 1, 4)
+    raises ValueError.
+    """
+
+    def __init__(self, start, stop, count, unit = ""):
+        self.start = to_decimal(start)
+        self.stop = to_decimal(stop)
+        self.count = int(count)
+        self.unit = unit
+        self.step = Decimal(0)
+        if self.count > 1:
+            with localcontext() as context:
+                context.traps[Inexact] = True
+                try:
+                    self.step = (self.stop - self.start) / (self.count - 1)
+                except Inexact:
+                    raise ValueError(f"{self.count} values from {start} to {stop} do not have an exact "
+                                     f"step; use LinearStep or another count") from None
+
+    def value(self, index):
+        return self.start + index * self.step
+
+    def __len__(self):
+        return self.count
+
+
+class ValueList(Sweep):
+    """Explicit list of values."""
+
+    def __init__(self, values, unit = ""):
+        self._values = [to_decimal(v) for v in values]
+        self.unit = unit
+
+    def value(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+
+class Cartesian:
+    """
+    Every combination of the values of the given sweeps, e.g.
+    Cartesian({"SW": LinearStep(1.5, 2.5, 0.5, "um"), "MT": ...}).
+
+    Iterating yields {variable: label} dicts with the last variable changing fastest, the
+    same order as nested for loops.
+    """
+
+    def __init__(self, sweeps):
+        self.sweeps = dict(sweeps)
+
+    @classmethod
+    def from_axes(cls, axes):
+        """Grid of {variable: [labels]} axes, e.g. as saved from axes()."""
+        sweeps = {}
+        for name, labels in axes.items():
+            parsed = [parse_label(label) for label in labels]
+            units = {unit for _, unit in parsed}
+            if len(units) > 1:
+                raise ValueError(f"Labels of {name} differ in unit: {sorted(units)}")
+            sweeps[name] = ValueList([value for value, _ in parsed], units.pop() if units else "")
+        return cls(sweeps)
+
+    def __len__(self):
+        total = 1
+        for sweep in self.sweeps.values():
+            total *= len(sweep)
+        return total
+
+    def __iter__(self):
+        names = list(self.sweeps)
+        for labels in product(*self.sweeps.values()):
+            yield dict(zip(names, labels))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        variation = {}
+        for name, sweep in reversed(list(self.sweeps.items())):
+            index, position = divmod(index, len(sweep))
+            variation[name] = sweep[position]
+        return dict(reversed(list(variation.items())))
+
+    def axes(self):
+        """{variable: [labels]} of each axis."""
+        return {name: list(sweep) for name, sweep in self.sweeps.items()}
+
+
+class Zip(Cartesian):
+    """The i-th values of sweeps of equal length taken together."""
+
+    def __init__(self, sweeps):
+        super().__init__(sweeps)
+        lengths = {len(sweep) for sweep in self.sweeps.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Zipped sweeps differ in length: {sorted(lengths)}")
+
+    def __len__(self):
+        return min((len(sweep) for sweep in self.sweeps.values()), default = 0)
+
+    def __iter__(self):
+        names = list(self.sweeps)
+        for labels in zip(*self.sweeps.values()):
+            yield dict(zip(names, labels))
+
+    def __getitem__(self, index):
+        return {name: sweep[index] for name, sweep in self.sweeps.items()}
+
+    def axes(self):
+        raise TypeError("A Zip grid has no Cartesian axes; its variations do not fill a block of "
+                        "{variable: [labels]}")
+
+
+def variation_key(variation):
+    """Stable text key of a variation, e.g. "SW=2.0um;MT=3.0um"."""
+    return ";".join(f"{name}={label}" for name, label in variation.items())
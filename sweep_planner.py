@@ -0,0 +1,125 @@
+"""
+Project: Adaptive Planning of the Next Optimetrics Variations
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that reads the metrics of the variations solved so far and proposes
+      the next batch of geometry points to solve, instead of filling a fixed LinearStep
+      grid evenly.
+    - Solved points are joined to their nearest solved neighbour along each axis. An edge
+      is scored by how much the metrics change along it (relative to their spread over all
+      points) and ranked first if a metric crosses its spec limit there. The midpoints of
+      the best edges longer than twice `min_step` are proposed.
+    - Points and proposals are {variable: label} dicts such as {"SW": "2.25um"}, with
+      exact Decimal midpoints, so they can be passed directly to
+      export_engine.export_variations or solver_scheduler.plan_jobs.
+    - Metrics are taken from the "<file>_metrics.npz" files of touchstone_export.py (see
+      channel_metrics.py) or from any {variation: values} mapping.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import re
+from decimal import Decimal
+
+import numpy as np
+
+from sweep_grid import format_value, variation_key
+
+_label = re.compile(r"^\s*([-+]?[0-9.]+)\s*(\w*)$")
+
+
+def split_label(label):
+    """(Decimal value, unit) of a label such as "2.0um"."""
+    match = _label.match(str(label))
+    if match is None:
+        raise ValueError(f"Not a numeric label: {label!r}")
+    return Decimal(match.group(1)), match.group(2)
+
+
+def parse_file_variation(name, axes = ("SW", "MT", "DT"), suffixes = ("W", "T", "H")):
+    """
+    Variation of a file name written by touchstone_export.py, e.g.
+    "GSG_2.0umW_3.0umT_2.0umH_metrics.npz" -> {"SW": "2.0um", "MT": "3.0um", "DT": "2.0um"}.
+    """
+    pattern = "_".join(rf"([-+0-9.]+[a-z]*){suffix}" for suffix in suffixes)
+    match = re.search(pattern, name)
+    if match is None:
+        raise ValueError(f"No {'/'.join(axes)} variation in {name!r}")
+    return dict(zip(axes, match.groups()))
+
+
+def load_samples(files, score, variation_of = parse_file_variation):
+    """
+    {variation key: (variation, metric values)} of metrics files.
+
+    `score(metrics)` reduces the arrays of one .npz file (IL, RL, ... and frequencies)
+    to the metric values to plan on, e.g. the worst IL at the Nyquist frequency.
+    """
+    samples = {}
+    for path in files:
+        variation = variation_of(str(path).replace("\\", "/").rsplit("/", 1)[-1])
+        with np.load(path) as metrics:
+            samples[variation_key(variation)] = (variation, np.atleast_1d(np.asarray(score(metrics), dtype = float)))
+    return samples
+
+
+def _edges(points):
+    """Pairs (i, j, axis) of points that differ in one axis with no point between them."""
+    edges = []
+    for axis in range(points.shape[1]):
+        others = np.delete(points, axis, axis = 1)
+        lines = {}
+        for index, key in enumerate(map(tuple, others)):
+            lines.setdefault(key, []).append(index)
+        for members in lines.values():
+            members.sort(key = lambda index: points[index, axis])
+            edges += [(i, j, axis) for i, j in zip(members, members[1:])]
+    return edges
+
+
+def propose_variations(samples, batch_size = 8, limits = None, min_step = "0.1"):
+    """
+    The next `batch_size` variations to solve.
+
+    `samples` is {key: (variation, metric values)} as returned by load_samples; `limits`
+    gives a spec limit per metric value (None or NaN for none). `min_step` is the
+    smallest spacing (per axis, or one value for all) between solved points.
+    """
+    entries = list(samples.values())
+    if len(entries) < 2:
+        return []
+    names = list(entries[0][0])
+    units = {name: split_label(entries[0][0][name])[1] for name in names}
+    exact = np.array([[split_label(variation[name])[0] for name in names] for variation, _ in entries],
+                     dtype = object)
+    points = exact.astype(float)
+    values = np.stack([values for _, values in entries])
+
+    spread = np.ptp(values, axis = 0)
+    spread[spread == 0] = 1.0
+    limits = np.full(values.shape[1], np.nan) if limits is None else \
+        np.array([np.nan if limit is None else limit for limit in np.atleast_1d(limits)], dtype = float)
+    steps = min_step if isinstance(min_step, dict) else {name: min_step for name in names}
+
+    known = {variation_key(variation) for variation, _ in entries}
+    candidates = {}
+    for i, j, axis in _edges(points):
+        lower, upper = exact[i, axis], exact[j, axis]
+        if upper - lower < 2 * Decimal(str(steps[names[axis]])):
+            continue
+
+        change = np.abs(values[j] - values[i]) / spread
+        crossing = np.any((values[i] - limits) * (values[j] - limits) < 0)
+        score = (1.0 if crossing else 0.0, float(change.max()))
+
+        midpoint = dict(entries[i][0])
+        midpoint[names[axis]] = format_value((lower + upper) / 2, units[names[axis]])
+        key = variation_key(midpoint)
+        if key not in known and (key not in candidates or candidates[key][0] < score):
+            candidates[key] = (score, midpoint)
+
+    ranked = sorted(candidates.values(), key = lambda candidate: candidate[0], reverse = True)
+    return [variation for _, variation in ranked[:batch_size]]
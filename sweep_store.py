@@ -0,0 +1,143 @@
+"""
+Project: Consolidated Store for Optimetrics Sweeps
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that keeps the S-parameters of a whole optimetrics sweep (for example
+      the SW x MT x DT grid of touchstone_export.py) in a single array file instead of one
+      touchstone file per grid point.
+    - The store "GSG_sweep" is a .npy file ("GSG_sweep.npy") and a JSON header
+      ("GSG_sweep.json") holding the sweep axes, frequencies, port names and the grid points
+      written so far.
+    - Data is laid out as (axis..., port, port, freq), so each S(i,j) trace of a grid point
+      is one contiguous chunk. The file is opened as a memory map and reads such as
+      "S(3,1) across all MT values" only touch the pages of the traces they need.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import os
+import json
+
+import numpy as np
+
+
+class SweepStore:
+    """
+    S-parameters of a sweep grid in one memory-mapped file.
+
+    `axes` maps each sweep variable to its value labels, e.g.
+    {"SW": ["1.5um", "2.0um"], "MT": [...], "DT": [...]}. Logically the store is indexed
+    by (axis..., freq, port, port), like the arrays returned by touchstone_io.
+    """
+
+    def __init__(self, path, mode = "r"):
+        self.path = str(path)
+        with open(self.path + ".json") as f:
+            self.header = json.load(f)
+
+        self.axes = {name: list(labels) for name, labels in self.header["axes"]}
+        self.frequencies = np.array(self.header["frequencies"])
+        self.port_names = self.header["port_names"]
+        self.written = {tuple(index) for index in self.header["written"]}
+        self.mode = mode
+        self.data = np.load(self.path + ".npy", mmap_mode = "r+" if mode == "r+" else "r")
+
+    @classmethod
+    def create(cls, path, axes, frequencies, port_names):
+        """Create an empty store for the given sweep axes, frequencies and ports."""
+        path = str(path)
+        shape = (*[len(labels) for labels in axes.values()],
+                 len(port_names), len(port_names), len(frequencies))
+
+        data = np.lib.format.open_memmap(path + ".npy", mode = "w+", dtype = np.complex128, shape = shape)
+        del data
+
+        header = {
+            "version": 1,
+            "axes": [[name, list(labels)] for name, labels in axes.items()],
+            "frequencies": np.asarray(frequencies, dtype = float).tolist(),
+            "port_names": list(port_names),
+            "written": [],
+        }
+        _write_json(path + ".json", header)
+        return cls(path, mode = "r+")
+
+    @classmethod
+    def open_or_create(cls, path, axes, frequencies, port_names):
+        """Open an existing store with the same axes and ports for writing, or create one."""
+        if os.path.exists(str(path) + ".json"):
+            store = cls(path, mode = "r+")
+            if store.axes == {name: list(labels) for name, labels in axes.items()} \
+                    and store.port_names == list(port_names):
+                return store
+            store.close()
+        return cls.create(path, axes, frequencies, port_names)
+
+    @property
+    def shape(self):
+        """Logical shape (axis..., freq, port, port)."""
+        *grid, n, _, nfreq = self.data.shape
+        return (*grid, nfreq, n, n)
+
+    def index(self, variation):
+        """Grid index of a variation given as {axis: label} or a sequence of labels."""
+        if isinstance(variation, dict):
+            variation = [variation[name] for name in self.axes]
+        return tuple(labels.index(label) for labels, label in zip(self.axes.values(), variation))
+
+    def write(self, variation, s):
+        """Store the (nfreq, nports, nports) matrices of one grid point."""
+        index = self.index(variation)
+        self.data[index] = np.asarray(s).transpose(1, 2, 0)
+        self.written.add(index)
+
+    def flush(self):
+        """Flush written data, then record the written grid points in the header."""
+        self.data.flush()
+        self.header["written"] = sorted(list(index) for index in self.written)
+        _write_json(self.path + ".json", self.header)
+
+    def is_written(self, variation):
+        return self.index(variation) in self.written
+
+    def sparams(self):
+        """All data as a (axis..., freq, port, port) view; nothing is read until sliced."""
+        ndim = self.data.ndim
+        return self.data.transpose(*range(ndim - 3), ndim - 1, ndim - 3, ndim - 2)
+
+    def term(self, i, j, **selection):
+        """
+        Return S(i,j) (1-based port numbers or port names) over the grid and frequency.
+
+        Keyword arguments select axis labels, e.g. term(3, 1, SW = "2.0um", DT = "2.0um")
+        returns S(3,1) for every MT value, with shape (len(MT), nfreq).
+        """
+        i = self._port(i)
+        j = self._port(j)
+        index = tuple(labels.index(selection[name]) if name in selection else slice(None)
+                      for name, labels in self.axes.items())
+        return np.array(self.data[index + (i, j)])
+
+    def _port(self, port):
+        return self.port_names.index(port) if isinstance(port, str) else port - 1
+
+    def close(self):
+        if self.mode == "r+":
+            self.flush()
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _write_json(json_path, header):
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(header, f)
+    os.replace(tmp_path, json_path)
@@ -0,0 +1,129 @@
+"""
+Project: Binary Cache for Exported Touchstone Files
+Author: Youngeun Na
+Date: 2026-10-16
+Version: 1.0
+Description:
+    - This is a module that keeps a binary sidecar cache next to each touchstone file,
+      so the text data is parsed only once.
+    - The cache of "GSG_2.0W_2.0T_2.0H.s40p" is a raw NumPy array
+      ("GSG_2.0W_2.0T_2.0H.s40p.npy") plus a JSON header ("GSG_2.0W_2.0T_2.0H.s40p.json")
+      with the frequencies, port names and the size, mtime and fingerprint of the source.
+    - A cache is valid while the source size and mtime match, or, when only the mtime
+      changed, while its fingerprint matches (see file_stamp.py). Valid caches are opened
+      with np.load in memory-map mode, so loading is zero-copy.
+    - Headers are always replaced atomically, so readers in other processes (e.g. the
+      process pool of network_checks.py) never see a half-written one.
+    - port_renaming.py removes the cache of a file it renames, as the cache holds the old
+      port labels; it is rebuilt on the next load.
+Dependencies:
+    - Python 3.x
+    - NumPy
+"""
+
+import os
+import json
+import tempfile
+
+import numpy as np
+
+from file_stamp import file_stamp, is_unchanged
+from touchstone_io import TouchstoneData, read_touchstone
+
+
+def cache_paths(file_path):
+    """Return the paths of the array and header sidecars of a touchstone file."""
+    file_path = str(file_path)
+    return file_path + ".npy", file_path + ".json"
+
+
+def write_cache(file_path, data = None):
+    """
+    Write the cache of a touchstone file, parsing it unless `data` is given.
+
+    The header is written last, so a cache interrupted halfway is never seen as valid.
+    """
+    npy_path, json_path = cache_paths(file_path)
+    if data is None:
+        data = read_touchstone(file_path)
+
+    if os.path.exists(json_path):
+        os.remove(json_path)
+
+    tmp_path = npy_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(data.s, dtype = np.complex128))
+    os.replace(tmp_path, npy_path)
+
+    header = {
+        "version": 1,
+        "source": file_stamp(file_path),
+        "frequencies": np.asarray(data.frequencies, dtype = float).tolist(),
+        "port_names": list(data.port_names),
+        "z0": list(data.z0),
+        "parameter": data.parameter,
+    }
+    _write_header(json_path, header)
+
+    return data
+
+
+def _write_header(json_path, header):
+    """Write a cache header atomically through a temporary file unique to this writer."""
+    folder = os.path.dirname(os.path.abspath(json_path))
+    fd, tmp_path = tempfile.mkstemp(prefix = ".", suffix = ".tmp", dir = folder)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(header, f)
+        os.replace(tmp_path, json_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_cache_header(file_path):
+    """Return the cache header of a touchstone file if the cache is valid, else None."""
+    npy_path, json_path = cache_paths(file_path)
+    if not (os.path.exists(json_path) and os.path.exists(npy_path)):
+        return None
+
+    with open(json_path) as f:
+        header = json.load(f)
+
+    source = header["source"]
+    mtime_ns = source["mtime_ns"]
+    if not is_unchanged(file_path, source):
+        return None
+    if source["mtime_ns"] != mtime_ns:
+        _write_header(json_path, header)  # Touched or copied, but same content
+
+    return header
+
+
+def load_cached(file_path):
+    """Open the cache of a touchstone file as a read-only memory map, or return None."""
+    header = read_cache_header(file_path)
+    if header is None:
+        return None
+
+    npy_path, _ = cache_paths(file_path)
+    return TouchstoneData(
+        frequencies = np.array(header["frequencies"]),
+        s = np.load(npy_path, mmap_mode = "r"),
+        port_names = header["port_names"],
+        z0 = header["z0"],
+        parameter = header["parameter"],
+    )
+
+
+def load_touchstone(file_path, cache = True):
+    """Load a touchstone file from its cache, parsing it and writing the cache if needed."""
+    if not cache:
+        return read_touchstone(file_path)
+
+    data = load_cached(file_path)
+    if data is None:
+        write_cache(file_path)
+        data = load_cached(file_path)
+    return data
@@ -6,65 +6,238 @@ Version: 1.0
 Description:
     - This is a script that exports touchstone files from a completed
       AEDT project that includes at least one optimetrics setup.
+    - A binary cache (see touchstone_cache.py) is written next to each exported file.
+    - Optionally, the whole sweep is also collected into a single store indexed by
+      (SW, MT, DT, freq, port, port) (see sweep_store.py).
+    - Optionally, the IL/RL/NEXT/FEXT curves of each variation are computed from its
+      S-parameters (see channel_metrics.py) and saved as "<file>_metrics.npz".
+    - Optionally, a compact spline model of each variation is saved as "<file>_spline.npz"
+      to serve other frequency grids without exporting again (see frequency_model.py).
+    - Optionally, each exported file is checked for passivity and causality (see
+      network_checks.py) and a warning is printed for a bad variation.
+    - Optionally, a reduced touchstone file with only the selected ports is written
+      (see port_selection.py), and the full 40-port file can be dropped.
+    - AEDT exports variation N while the caching/storing of the earlier variations runs in
+      worker threads (see export_engine.py).
+    - In incremental mode, variations whose touchstone file is up to date for their own
+      solution are not exported again, so solving new variations only exports those. A reduced file, or the file renamed by
+      port_renaming.py, counts as up to date when the full file is gone.
+    - "<file>.done" is written once all post-export steps of a variation have finished,
+      and export_list.json lists all planned files; run_pipeline.py renames files from
+      these, so no file is renamed while it is still being read.
+    - The variations are those of the sweep saved with the design by
+      simple_ucie_channel_model.py ("<design>.sweep.json", set with UCIE_SWEEP), or else
+      the SW x MT x DT grid below.
+    - The project, design and export folder can be set with the UCIE_PROJECT, UCIE_DESIGN
+      and UCIE_EXPORT_DIR environment variables (see run_pipeline.py).
 Dependencies:
     - PyAEDT 0.18.0
     - HFSS 2025 R1
+    - NumPy
 """
 
+import os
+import json
 from pyaedt import Hfss
 from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+from channel_metrics import channel_metrics
+from export_engine import ExportIndex, export_variations, solution_identity
+from frequency_model import SplineModel
+from network_checks import check_network, report
+
+from port_renaming import load_manifest
+from port_selection import write_reduced_touchstone
+from sweep_grid import Cartesian, LinearStep
+from sweep_store import SweepStore
+from touchstone_cache import cache_paths, load_touchstone
+from touchstone_io import read_touchstone
 
 # Folder to which the touchstone files are exported
-touchstone_dir = r"D:\02_Users\UCIe" # Edit this
+touchstone_dir = os.environ.get("UCIE_EXPORT_DIR", r"D:\02_Users\UCIe") # Edit this
 export_ts_to_dir = Path(touchstone_dir)
 export_ts_to_dir.mkdir(parents = True, exist_ok = True)
 
+# Saved sweep of the design ("<design>.sweep.json"); None to export the grid below
+sweep_path = os.environ.get("UCIE_SWEEP") # Edit this
+
+# Label suffix of each sweep variable in file names, e.g. SW = 2.0um -> "2.0umW"
+label_suffixes = {"SW": "W", "MT": "T", "DT": "H"} # Edit this
+
+# Write a binary cache next to each touchstone file
+build_cache = True # Edit this
+
+# Collect the whole sweep into one store (None to disable)
+sweep_store_path = export_ts_to_dir / "GSG_sweep" # Edit this
+
+# Save the IL/RL/NEXT/FEXT/power-sum curves of each variation
+write_metrics = True # Edit this
+
+# Save a spline model of each variation with this |S| tolerance (None to disable)
+spline_tolerance = 1e-3 # Edit this
+
+# Check each exported file for passivity and causality
+check_exports = True # Edit this
+
+# Ports kept in a reduced touchstone file (None to disable), e.g.
+# port_selection.ports_in_expressions(expressions_for_IL + expressions_for_RL)
+selected_ports = None # Edit this
+keep_full_touchstone = True # Edit this
+
+# Skip variations whose touchstone file is up to date
+incremental = True # Edit this
+
+# Worker threads for the post-export work, and variations allowed to wait for them
+post_export_workers = 2 # Edit this
+max_pending_exports = 4 # Edit this
+
 # Open (or create) project/design in a fresh AEDT Desktop session
 with Hfss(
-    project = r"D:\02_Users\UCIe\01_channel_model\ucie_channel_2.0W_2.0S_2.0T_2.0H.aedt", # Edit this
-    design = f"GSG_6Layer", # Edit this
+    project = os.environ.get("UCIE_PROJECT", r"D:\02_Users\UCIe\01_channel_model\ucie_channel_2.0W_2.0S_2.0T_2.0H.aedt"), # Edit this
+    design = os.environ.get("UCIE_DESIGN", f"GSG_6Layer"), # Edit this
     solution_type = "Terminal",
     version = "2025.1",
     new_desktop = True
 ) as hfss:
 
     # Optimetrics analysis and export of files
-    def current_sweep(start, stop, step, unit = ""):
-        values = []
-        val = start
-        while val <= stop + 1e-12:
-            values.append(f"{val}{unit}")
-            val += step
-        return values
-
-    sw_vals = current_sweep(1.5, 2.5, 0.5, "um") # Edit this
-    mt_vals = current_sweep(2.0, 4.0, 1.0, "um") # Edit this
-    dt_vals = current_sweep(2.0, 6.0, 2.0, "um") # Edit this
-
-    sweep_values = {"SW": sw_vals, "MT": mt_vals, "DT": dt_vals}
-
-    for sw_var in sw_vals:
-        for mt_var in mt_vals:
-            for dt_var in dt_vals:
-                
-                variations = ["SW", "MT", "DT"]
-                variations_value = [sw_var, mt_var, dt_var]
-                var_label = f"{sw_var}W_{mt_var}T_{dt_var}H"
-    
-                # Export touchstone file
-                touchstone_name = f"GSG_{var_label}.s40p" # Edit port number if necessary
-                touchstone_save_path = export_ts_to_dir / touchstone_name
-    
-                hfss.export_touchstone(
-                    setup = "Setup1",
-                    sweep = "Sweep",
-                    output_file = touchstone_save_path,
-                    variations = variations,
-                    variations_value = variations_value,
-                    renormalization = False,
-                    impedance = 50,
-                )
-                print(f"✅ Exported touchstone: {touchstone_dir}")
+    if sweep_path:
+        with open(sweep_path) as f:
+            sweep_grid = Cartesian.from_axes(json.load(f)["axes"])
+    else:
+        sw_vals = LinearStep(1.5, 2.5, 0.5, "um") # Edit this
+        mt_vals = LinearStep(2.0, 4.0, 1.0, "um") # Edit this
+        dt_vals = LinearStep(2.0, 6.0, 2.0, "um") # Edit this
+
+        sweep_grid = Cartesian({"SW": sw_vals, "MT": mt_vals, "DT": dt_vals})
+    sweep_values = sweep_grid.axes()
+
+    sweep_store = None
+    sweep_store_lock = Lock()
+
+    def variation_label(variation):
+        return "_".join(f"{value}{label_suffixes.get(name.lstrip('$').upper(), name)}"
+                        for name, value in variation.items())
+
+    def touchstone_path(variation):
+        return export_ts_to_dir / f"GSG_{variation_label(variation)}.s40p" # Edit port number if necessary
+
+    def post_export(result):
+        global sweep_store
+
+        variation = result.variation
+        touchstone_save_path = result.output_file
+        var_label = variation_label(variation)
+        if result.skipped and not touchstone_save_path.exists():
+            # Current through its reduced or renamed file; the sidecars were made before
+            print(f"✅ Touchstone up to date (reduced or renamed): {touchstone_save_path.name}")
+            return
+        if result.skipped:
+            print(f"✅ Touchstone up to date: {touchstone_save_path.name}")
+        else:
+            print(f"✅ Exported touchstone: {touchstone_save_path.name}")
+
+        # Each step skips work already done for an up-to-date file
+        data = None
+        if build_cache:
+            data = load_touchstone(touchstone_save_path)
+            print(f"✅ Cached touchstone: {touchstone_save_path.name}")
+
+        if sweep_store_path is not None:
+            if data is None:
+                data = read_touchstone(touchstone_save_path)
+            with sweep_store_lock:
+                if sweep_store is None:
+                    sweep_store = SweepStore.open_or_create(sweep_store_path, sweep_values,
+                                                            data.frequencies, data.port_names)
+            if not (result.skipped and sweep_store.is_written(variation)):
+                sweep_store.write(variation, data.s)
+                print(f"✅ Stored variation {var_label} in {sweep_store_path}")
+
+        if write_metrics:
+            metrics_save_path = touchstone_save_path.with_name(f"{touchstone_save_path.stem}_metrics.npz")
+            if not (metrics_save_path.exists()
+                    and metrics_save_path.stat().st_mtime_ns >= touchstone_save_path.stat().st_mtime_ns):
+                if data is None:
+                    data = read_touchstone(touchstone_save_path)
+                np.savez(metrics_save_path, frequencies = data.frequencies,
+                         **channel_metrics(data.s, data.port_names))
+                print(f"✅ Saved metrics: {metrics_save_path.name}")
+
+        if spline_tolerance is not None:
+            spline_save_path = touchstone_save_path.with_name(f"{touchstone_save_path.stem}_spline.npz")
+            if not (spline_save_path.exists()
+                    and spline_save_path.stat().st_mtime_ns >= touchstone_save_path.stat().st_mtime_ns):
+                if data is None:
+                    data = read_touchstone(touchstone_save_path)
+                model = SplineModel.fit(data, tolerance = spline_tolerance)
+                model.save(spline_save_path)
+                print(f"✅ Saved spline model with {len(model.knots)} knots: {spline_save_path.name}")
+
+        if check_exports and not result.skipped:
+            if data is None:
+                data = read_touchstone(touchstone_save_path)
+            report(check_network(data.frequencies, data.s, touchstone_save_path.name))
+
+        if selected_ports:
+            reduced_save_path = export_ts_to_dir / f"GSG_{var_label}.s{len(selected_ports)}p"
+            if not (reduced_save_path.exists()
+                    and reduced_save_path.stat().st_mtime_ns >= touchstone_save_path.stat().st_mtime_ns):
+                write_reduced_touchstone(touchstone_save_path, reduced_save_path, selected_ports)
+                print(f"✅ Exported reduced touchstone: {reduced_save_path.name}")
+            if export_index is not None:
+                export_index.add_output(touchstone_save_path, reduced_save_path)
+                export_index.save()
+
+            if not keep_full_touchstone:
+                for path in [touchstone_save_path, *map(Path, cache_paths(touchstone_save_path))]:
+                    path.unlink(missing_ok = True)
+
+        # Mark the file as finished: nothing reads it any more, so it may be renamed
+        done_path = Path(f"{touchstone_save_path}.done")
+        if not (result.skipped and done_path.exists()):
+            done_path.write_text(touchstone_save_path.name)
+
+    # Key each export by the solved variation, so unchanged files are not exported again
+    export_index = ExportIndex(export_ts_to_dir / "export_index.json") if incremental else None
+    if export_index is not None:
+        # Files renamed by port_renaming.py (see run_pipeline.py) stand in for their export
+        for renamed, entry in load_manifest(str(export_ts_to_dir / "case_manifest.json")).items():
+            export_index.add_output(export_ts_to_dir / entry["source"], export_ts_to_dir / renamed,
+                                    {key: entry[key] for key in ("size", "mtime_ns", "hash")})
+    export_context = {
+        "project": hfss.project_name,
+        "design": hfss.design_name,
+    }
+
+    def variation_solution(variation):
+        return solution_identity(hfss, "Setup1", variation, export_ts_to_dir)
+
+    # All planned file names, so port_renaming.py can fix case IDs up front (see run_pipeline.py)
+    with open(export_ts_to_dir / "export_list.json", "w") as f:
+        json.dump({"version": 1, "files": [touchstone_path(v).name for v in sweep_grid]}, f, indent = 1)
+
+    export_variations(
+        hfss,
+        sweep_grid,
+        touchstone_path,
+        post_export = post_export,
+        workers = post_export_workers,
+        max_pending = max_pending_exports,
+        setup = "Setup1",
+        sweep = "Sweep",
+        index = export_index,
+        context = export_context,
+        solution_id = variation_solution,
+        renormalization = False,
+        impedance = 50,
+    )
+
+    if sweep_store is not None:
+        sweep_store.close()
 
     # Save project
     hfss.save_project()